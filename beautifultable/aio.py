@@ -0,0 +1,148 @@
+"""Module containing the asynchronous counterparts of `stream`
+
+Asynchronous generators require python 3.6 or later, so this module is only
+imported if the syntax is supported.
+"""
+
+import asyncio
+import collections
+import time
+
+from .rows import RowData
+
+
+async def _aiter(rows):
+    for row in rows:
+        yield row
+
+
+async def _resume(pending, rows):
+    """Yield the row fetched by the task `pending`, then the rest of `rows`."""
+    try:
+        yield await pending
+    except StopAsyncIteration:
+        return
+    async for row in rows:
+        yield row
+
+
+async def _sample_rows(table, rows, size, duration):
+    """Asynchronous version of `BeautifulTable._sample_rows`.
+
+    Also returns the task fetching the next row if `duration` runs out
+    while waiting for it. Cancelling it would close a generator `rows`.
+    """
+    sample = []
+    deadline = None if duration is None else time.monotonic() + duration
+    while size is None or len(sample) < size:
+        if deadline is None:
+            try:
+                row = await rows.__anext__()
+            except StopAsyncIteration:
+                break
+        else:
+            pending = asyncio.ensure_future(rows.__anext__())
+            remaining = max(0, deadline - time.monotonic())
+            await asyncio.wait([pending], timeout=remaining)
+            if not pending.done():
+                return sample, pending
+            try:
+                row = pending.result()
+            except StopAsyncIteration:
+                break
+        sample.append(RowData(table, table._validate_row(row)))
+    return sample, None
+
+
+async def astream(
+    table,
+    rows,
+    append=False,
+    keep_last=None,
+    sample_size=None,
+    sample_time=None,
+):
+    """Implementation of `BeautifulTable.astream`."""
+    if not hasattr(rows, "__aiter__"):
+        rows = _aiter(rows)
+    rows = rows.__aiter__()
+    sample = []
+    pending = None
+    recalculate_width = False
+    if sample_size is not None or sample_time is not None:
+        sample, pending = await _sample_rows(
+            table, rows, sample_size, sample_time
+        )
+        recalculate_width = True
+        if pending is not None:
+            rows = _resume(pending, rows)
+
+    layout = table._get_layout(recalculate_width, sample)
+    for line in table._get_head(layout):
+        yield line
+
+    # Streamed rows are only added to the table once the stream ends
+    streamed = collections.deque(maxlen=keep_last) if append else None
+    try:
+        i = len(table)
+        for row in sample:
+            i += 1
+            if streamed is not None:
+                streamed.append(row._row)
+            for line in table._render_rows([row], i, layout):
+                yield line
+        async for row in rows:
+            i += 1
+            row = RowData(table, table._validate_row(row))
+            if streamed is not None:
+                streamed.append(row._row)
+            for line in table._render_rows([row], i, layout):
+                yield line
+
+        # Drawing the bottom border
+        if table.bottom_border_char:
+            yield table._get_bottom_border(layout.column_widths)
+    finally:
+        if pending is not None:
+            pending.cancel()
+        if streamed is not None:
+            table._append_streamed(streamed, keep_last)
+
+
+async def write_to(
+    table,
+    writer,
+    rows,
+    append=False,
+    keep_last=None,
+    sample_size=None,
+    sample_time=None,
+    buffer_size=65536,
+    encoding="utf-8",
+):
+    """Implementation of `BeautifulTable.astream_to`."""
+    buffer = []
+    size = 0
+    async for line in astream(
+        table,
+        rows,
+        append=append,
+        keep_last=keep_last,
+        sample_size=sample_size,
+        sample_time=sample_time,
+    ):
+        buffer.append(line)
+        size += len(line) + 1
+        if size >= buffer_size:
+            buffer.append("")
+            writer.write("\n".join(buffer).encode(encoding))
+            buffer = []
+            size = 0
+            await writer.drain()
+            # drain() returns right away unless the transport is paused,
+            # give other tasks a chance to run regardless.
+            await asyncio.sleep(0)
+    if buffer:
+        buffer.append("")
+        writer.write("\n".join(buffer).encode(encoding))
+        await writer.drain()
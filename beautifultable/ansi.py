@@ -3,63 +3,233 @@
 from __future__ import unicode_literals
 
 
+import functools
 import re
+import weakref
+from array import array
+from bisect import bisect_right
+from itertools import accumulate
 
-try:
-    from wcwidth import wcwidth
-except ImportError:  # pragma: no cover
-    wcwidth = len  # pragma: no cover
-
+from . import charwidth
 from .compat import to_unicode
 
+# Width of every code point in the Basic Multilingual Plane, stored as a
+# str so that whole strings can be measured with str.translate. The width
+# is the ordinal of the char, with NON_PRINTABLE standing in for -1.
+NON_PRINTABLE = 0xFF
+
+
+def _build_width_tables():
+    bmp = bytearray(b"\x01") * 0x10000
+    astral = []
+    for ranges, width in (
+        (charwidth.NON_PRINTABLE, NON_PRINTABLE),
+        (charwidth.ZERO_WIDTH, 0),
+        (charwidth.WIDE, 2),
+    ):
+        for first, last in ranges:
+            if first < 0x10000:
+                stop = min(last, 0xFFFF) + 1
+                bmp[first:stop] = bytes([width]) * (stop - first)
+            if last >= 0x10000:
+                astral.append((max(first, 0x10000), last, width))
+    astral.sort()
+    return bmp.decode("latin-1"), [r[0] for r in astral], astral
+
+
+_BMP_WIDTHS, _ASTRAL_STARTS, _ASTRAL_RANGES = _build_width_tables()
+
+
+def char_width(char):
+    """Returns the number of columns `char` occupies on a terminal.
+
+    -1 is returned for characters which cannot be printed.
+    """
+    code = ord(char)
+    if code < 0x10000:
+        width = ord(_BMP_WIDTHS[code])
+    else:
+        index = bisect_right(_ASTRAL_STARTS, code) - 1
+        width = 1
+        if index >= 0 and code <= _ASTRAL_RANGES[index][1]:
+            width = _ASTRAL_RANGES[index][2]
+    return -1 if width == NON_PRINTABLE else width
+
+
+def char_widths(string):
+    """Returns the width of every char in `string` as a bytes object.
+
+    Non printable characters have the width NON_PRINTABLE.
+    """
+    if string and max(string) > "\uffff":
+        return bytes(
+            NON_PRINTABLE if w == -1 else w for w in map(char_width, string)
+        )
+    return string.translate(_BMP_WIDTHS).encode("latin-1")
+
+
+if hasattr(str, "isascii"):
+
+    def is_printable_ascii(string):
+        """Returns True if `string` only contains printable ASCII chars.
+
+        Such strings cannot contain escape sequences and every character
+        in them is exactly one column wide.
+        """
+        return string.isascii() and string.isprintable()
+
+else:  # pragma: no cover
+    _PRINTABLE_ASCII_REGEX = re.compile(r"[ -~]*\Z")
+
+    def is_printable_ascii(string):
+        return _PRINTABLE_ASCII_REGEX.match(string) is not None
+
 
 class ANSIMultiByteString(object):
 
     ANSI_REGEX = re.compile(r"(\x1B\[[0-?]*[ -/]*[@-~])")
     ANSI_RESET = "\x1b[0m"
 
+    # Every distinct set of active escape sequences is stored only once and
+    # shared by all strings using it. Sets no longer used by any string are
+    # dropped.
+    _EMPTY_STATE = frozenset()
+    _STATES = weakref.WeakValueDictionary({frozenset(): _EMPTY_STATE})
+
+    # Number of chars measured at a time when scanning a string lazily
+    CHUNK_SIZE = 256
+
     def __init__(self, string):
-        self._string = []
-        self._state = []
-        self._width = []
+        # Characters are stored as a single str along with a flat array of
+        # their widths. The active ANSI state is stored as runs, i.e the
+        # state `_span_states[i]` applies to all characters starting at
+        # `_span_starts[i]` up to the start of the next run.
+        self._string = ""
+        self._width = array("B")
+        self._span_starts = []
+        self._span_states = []
         self._termwidth = 0
 
+        string = to_unicode(string)
+        if is_printable_ascii(string):
+            # Fast path, no escape sequences and every char is 1 column wide
+            self._string = string
+            self._width = array("B", [1]) * len(string)
+            self._termwidth = len(string)
+            self._add_span(0, self._EMPTY_STATE)
+            return
+
+        chars = []
+        length = 0
+        for token, state in self._iter_runs(string):
+            widths = self._measure(token)
+            self._termwidth += sum(widths)
+            self._width.frombytes(widths)
+            self._add_span(length, state)
+            chars.append(token)
+            length += len(token)
+        self._string = "".join(chars)
+
+    @classmethod
+    def _iter_runs(cls, string):
+        """Lazily yields `(text, state)` runs of a raw string.
+
+        `state` is the interned set of escape sequences active for `text`.
+        """
+        frozen = cls._EMPTY_STATE
+        if "\x1b" not in string:
+            # Plain unicode, no need to look for escape sequences
+            if string:
+                yield string, frozen
+            return
         state = set()
+        pos = 0
+        for match in cls.ANSI_REGEX.finditer(string):
+            start = match.start()
+            if start > pos:
+                yield string[pos:start], frozen
+            token = match.group()
+            if token == cls.ANSI_RESET:
+                state.clear()
+            else:
+                state.add(token)
+            key = frozenset(state)
+            frozen = cls._STATES.get(key)
+            if frozen is None:
+                # The key is a copy, so that it doesn't keep the set alive
+                frozen = cls._STATES[key] = frozenset(state)
+            pos = match.end()
+        if pos < len(string):
+            yield string[pos:], frozen
+
+    @staticmethod
+    def _measure(token):
+        """Returns widths of chars in `token`, validating they're printable"""
+        widths = char_widths(token)
+        if NON_PRINTABLE in widths:
+            char = token[widths.index(NON_PRINTABLE)]
+            raise ValueError(
+                ("Unsupported Literal {} in " "string {}").format(
+                    repr(char), repr(token)
+                )
+            )
+        return widths
+
+    def _add_span(self, start, state):
+        if self._span_states and self._span_states[-1] is state:
+            return
+        self._span_starts.append(start)
+        self._span_states.append(state)
+
+    def _spans(self, start=0, stop=None):
+        """Yields `(start, stop, state)` runs clipped to `[start, stop)`"""
+        if stop is None:
+            stop = len(self._string)
+        index = max(bisect_right(self._span_starts, start) - 1, 0)
+        for i in range(index, len(self._span_starts)):
+            span_start = max(self._span_starts[i], start)
+            if span_start >= stop:
+                break
+            if i + 1 < len(self._span_starts):
+                span_stop = min(self._span_starts[i + 1], stop)
+            else:
+                span_stop = stop
+            yield span_start, span_stop, self._span_states[i]
+
+    def _state_at(self, index):
+        return self._span_states[bisect_right(self._span_starts, index) - 1]
 
-        for token in re.split(self.ANSI_REGEX, to_unicode(string)):
-            if token:
-                if re.match(self.ANSI_REGEX, token):
-                    if token == self.ANSI_RESET:
-                        state.clear()
-                    else:
-                        state.add(token)
-                else:
-                    s_copy = set(state)
-                    for char in token:
-                        w = wcwidth(char)
-                        if w == -1:
-                            raise ValueError(
-                                (
-                                    "Unsupported Literal {} in " "string {}"
-                                ).format(repr(char), repr(token))
-                            )
-                        self._termwidth += w
-                        self._string.append(char)
-                        self._width.append(w)
-                        self._state.append(s_copy)
+    @classmethod
+    def _render(cls, runs):
+        """Joins `(text, state)` runs emitting escapes on state changes"""
+        res = []
+        prev_state = frozenset()
+        for text, state in runs:
+            if not text:
+                continue
+            if prev_state == state:
+                pass
+            elif prev_state <= state:
+                res.extend(state - prev_state)
+            else:
+                res.append(cls.ANSI_RESET)
+                res.extend(state)
+            prev_state = state
+            res.append(text)
+        if prev_state:
+            res.append(cls.ANSI_RESET)
+        return "".join(res)
 
     def __len__(self):
         return len(self._string)
 
     def __getitem__(self, key):
         if isinstance(key, int):
-            if self._state[key]:
-                return (
-                    "".join(self._state[key])
-                    + self._string[key]
-                    + self.ANSI_RESET
-                )
-            return self._string[key]
+            char = self._string[key]
+            state = self._state_at(range(len(self))[key])
+            if state:
+                return "".join(state) + char + self.ANSI_RESET
+            return char
         if isinstance(key, slice):
             return self._slice(key)
         raise TypeError(
@@ -69,52 +239,166 @@ class ANSIMultiByteString(object):
         )
 
     def _slice(self, key):
-        res = []
-        prev_state = set()
-        for char, state in zip(self._string[key], self._state[key]):
-            if prev_state == state:
-                pass
-            elif prev_state <= state:
-                res.extend(state - prev_state)
-            else:
-                res.append(self.ANSI_RESET)
-                res.extend(state)
-            prev_state = state
-            res.append(char)
-        if prev_state:
-            res.append(self.ANSI_RESET)
-        return "".join(res)
+        start, stop, step = key.indices(len(self))
+        if step == 1:
+            runs = (
+                (self._string[i:j], state)
+                for i, j, state in self._spans(start, stop)
+            )
+        else:
+            runs = (
+                (self._string[i], self._state_at(i))
+                for i in range(start, stop, step)
+            )
+        return self._render(runs)
 
     def termwidth(self):
         """Returns the width of string as when printed to a terminal"""
         return self._termwidth
 
-    def wrap(self, width):
-        """Returns a partition of the string based on `width`"""
+    @classmethod
+    def _truncate_runs(cls, runs, width):
+        """Keeps the runs which fit in `width`, consuming no more than needed.
+
+        Returns the rendered prefix, and whether anything was left out.
+        """
         res = []
-        prev_state = set()
-        part = []
         cwidth = 0
-        for char, _width, state in zip(self._string, self._width, self._state):
-            if cwidth + _width > width:
-                if prev_state:
-                    part.append(self.ANSI_RESET)
-                res.append("".join(part))
-                prev_state = set()
-                part = []
-                cwidth = 0
-            cwidth += _width
-            if prev_state == state:
-                pass
-            elif prev_state <= state:
-                part.extend(state - prev_state)
-            else:
-                part.append(self.ANSI_RESET)
-                part.extend(state)
-            prev_state = state
-            part.append(char)
-        if prev_state:
-            part.append(self.ANSI_RESET)
-        if part:
-            res.append("".join(part))
-        return res
+        for text, state in runs:
+            # Measure in chunks so that scanning stops soon after `width`
+            # is reached, even for a very long run.
+            for start in range(0, len(text), cls.CHUNK_SIZE):
+                stop = start + cls.CHUNK_SIZE
+                chunk = text[start:stop]
+                cumulative = list(accumulate(cls._measure(chunk)))
+                brk = bisect_right(cumulative, width - cwidth)
+                if brk < len(cumulative):
+                    res.append((chunk[:brk], state))
+                    return cls._render(res), True
+                cwidth += cumulative[-1]
+                res.append((chunk, state))
+        return cls._render(res), False
+
+    @classmethod
+    def truncate_string(cls, string, width):
+        """Truncate a raw string to `width` without parsing all of it.
+
+        Returns
+        -------
+        tuple:
+            The longest prefix of `string` which fits in `width` columns,
+            and a bool indicating whether the string was truncated.
+        """
+        return cls._truncate_runs(cls._iter_runs(to_unicode(string)), width)
+
+    def truncate(self, width):
+        """Returns the longest prefix of the string fitting in `width`"""
+        runs = ((self._string[i:j], state) for i, j, state in self._spans())
+        return self._truncate_runs(runs, width)[0]
+
+    @classmethod
+    def _wrap_runs(cls, runs, width):
+        """Lazily partitions `(text, state)` runs into lines of `width`"""
+        line = []
+        cwidth = 0
+        for text, state in runs:
+            for start in range(0, len(text), cls.CHUNK_SIZE):
+                stop = start + cls.CHUNK_SIZE
+                chunk = text[start:stop]
+                # Running total of widths in this chunk, used to locate
+                # the line breaks by bisection rather than char by char.
+                widths = cls._measure(chunk)
+                cumulative = list(accumulate(widths))
+                line_start = pos = 0
+                base = 0
+                while True:
+                    limit = width - cwidth + base
+                    brk = bisect_right(cumulative, limit, pos)
+                    if brk >= len(cumulative):
+                        cwidth += cumulative[-1] - base
+                        break
+                    line.append((chunk[line_start:brk], state))
+                    yield cls._render(line)
+                    line = []
+                    line_start = brk
+                    pos = brk + 1
+                    cwidth = widths[brk]
+                    base = cumulative[brk]
+                line.append((chunk[line_start:], state))
+        if any(text for text, _ in line):
+            yield cls._render(line)
+
+    @classmethod
+    def iter_wrap(cls, string, width):
+        """Lazily partition a raw string into lines based on `width`.
+
+        The string is tokenized and measured incrementally, so memory used
+        is proportional to `width` rather than to the length of `string`.
+        """
+        return cls._wrap_runs(cls._iter_runs(to_unicode(string)), width)
+
+    def wrap(self, width):
+        """Returns a partition of the string based on `width`"""
+        runs = ((self._string[i:j], state) for i, j, state in self._spans())
+        return list(self._wrap_runs(runs, width))
+
+
+def strip_ansi(string):
+    """Returns `string` with all ANSI escape sequences removed"""
+    if "\x1b" not in string:
+        return string
+    return ANSIMultiByteString.ANSI_REGEX.sub("", string)
+
+
+# SGR parameters which do not change how a space looks, i.e intensity,
+# italic, blink and foreground colors.
+_SPACE_INVISIBLE_SGR = frozenset(
+    [1, 2, 3, 5, 6, 22, 23, 25, 39] + list(range(30, 38)) + list(range(90, 98))
+)
+
+
+# Only the most recent results are kept, as every distinct color used in a
+# string produces a distinct set of tokens.
+@functools.lru_cache(256)
+def _is_space_invisible(tokens):
+    """Returns True if `tokens` have no visible effect on spaces"""
+    result = True
+    for token in tokens:
+        if not token.endswith("m"):
+            result = False
+            break
+        params = token[2:-1].split(";")
+        while params:
+            param = params.pop(0)
+            if param == "38" and params and params[0] in ("5", "2"):
+                # Extended foreground color, skip its arguments
+                del params[: 2 if params[0] == "5" else 4]
+            elif not param.isdigit() or int(param) not in _SPACE_INVISIBLE_SGR:
+                result = False
+                break
+        if not result:
+            break
+    return result
+
+
+def minimize_ansi(string):
+    """Returns `string` using the fewest escape sequences to look the same.
+
+    Redundant sequences, such as a reset immediately followed by the same
+    styles again, or styles applied to no visible text, are removed. Blank
+    gaps after a styled run are merged into it if the difference in style
+    has no visible effect on spaces, e.g a foreground color.
+    """
+    if "\x1b" not in string:
+        return string
+    runs = list(ANSIMultiByteString._iter_runs(string))
+    for i in range(1, len(runs)):
+        text, state = runs[i]
+        prev_state = runs[i - 1][1]
+        if (
+            state is not prev_state
+            and not text.strip(" ")
+            and _is_space_invisible(state ^ prev_state)
+        ):
+            runs[i] = (text, prev_state)
+    return ANSIMultiByteString._render(runs)
@@ -2,8 +2,12 @@ from .compat import basestring
 
 
 class BaseRow(object):
+    # Tables can hold millions of rows, so rows have no `__dict__` and
+    # store their items in a tuple which is replaced on modification.
+    __slots__ = ("_row", "_table")
+
     def __init__(self, table, row):
-        self._row = list(row)
+        self._row = tuple(row)
         self._table = table
 
     def __len__(self):
@@ -28,20 +32,41 @@ class BaseRow(object):
                 return False
         return True
 
+    def _changed(self):
+        # Hook called whenever the contents of the row are modified
+        self._table._mutated()
+
     def _append(self, item):
-        self._row.append(item)
+        self._row += (item,)
+        self._changed()
 
     def _insert(self, i, item):
-        self._row.insert(i, item)
+        row = list(self._row)
+        row.insert(i, item)
+        self._row = tuple(row)
+        self._changed()
 
     def _pop(self, i=-1):
-        return self._row.pop(i)
+        row = list(self._row)
+        item = row.pop(i)
+        self._row = tuple(row)
+        self._changed()
+        return item
 
     def _remove(self, item):
-        self._row.remove(item)
+        row = list(self._row)
+        row.remove(item)
+        self._row = tuple(row)
+        self._changed()
 
     def _clear(self):
-        self._row.clear()
+        self._row = ()
+        self._changed()
+
+    def _set(self, index, value):
+        row = list(self._row)
+        row[index] = value
+        self._row = tuple(row)
 
     def count(self, item):
         return self._row.count(item)
@@ -50,8 +75,10 @@ class BaseRow(object):
         return self._row.index(item, *args)
 
     def __getitem__(self, key):
-        if isinstance(key, (int, slice)):
+        if isinstance(key, int):
             return self._row[key]
+        if isinstance(key, slice):
+            return list(self._row[key])
         if isinstance(key, basestring):
             index = self._table.get_column_index(key)
             return self._row[index]
@@ -63,13 +90,14 @@ class BaseRow(object):
 
     def __setitem__(self, key, value):
         if isinstance(key, int):
-            self._row[key] = value
+            self._set(key, value)
         elif isinstance(key, basestring):
             index = self._table.get_column_index(key)
-            self._row[index] = value
+            self._set(index, value)
         else:
             raise TypeError(
                 ("row indices must be integers or slices, " "not {}").format(
                     type(key).__name__
                 )
             )
+        self._changed()
@@ -27,14 +27,18 @@ Example
 """
 from __future__ import division, unicode_literals
 
+import collections
 import copy
 import csv
+import itertools
 import operator
+import time
 
 from . import enums
 
-from .utils import get_output_str, raise_suppressed, termwidth, deprecation
-from .rows import RowData, HeaderData
+from .utils import raise_suppressed, termwidth, deprecation
+from .rows import RowData, HeaderData, RowLayout
+from .storage import ColumnStorage
 from .meta import AlignmentMetaData, PositiveIntegerMetaData
 from .compat import basestring, Iterable, to_unicode
 
@@ -42,6 +46,18 @@ from .compat import basestring, Iterable, to_unicode
 __all__ = ["BeautifulTable"]
 
 
+def _import_aio(method):
+    """Import the `aio` module on first use, as it loads `asyncio`."""
+    try:
+        from . import aio
+    except SyntaxError:  # pragma: no cover
+        # Asynchronous generators require python 3.6
+        raise_suppressed(
+            NotImplementedError("{} requires python 3.6".format(method))
+        )
+    return aio
+
+
 class BeautifulTable(object):
     """Utility Class to print data in tabular format to terminal.
 
@@ -64,6 +80,12 @@ class BeautifulTable(object):
     default_padding : int, optional
         Default width of the left and right padding for new columns(default 1).
 
+    columnar : bool, optional
+        Whether items should be stored as one list per column instead of one
+        object per row(default False). Column operations and width
+        calculation are faster, while rows are accessed through views which
+        refer to a position in the table.
+
     Attributes
     ----------
     left_border_char : str
@@ -142,6 +164,17 @@ class BeautifulTable(object):
 
     detect_numerics : bool
         Whether numeric strings should be automatically detected(Default True).
+
+    strip_ansi_sequences : bool
+        Whether ANSI escape sequences should be removed from items and
+        headers as they are added to the table. Useful when the output is
+        not meant for a terminal(Default False).
+
+    max_rows : int
+        Maximum number of rows to render. If the table has more rows, only
+        the leading and trailing rows are rendered with a row of ellipses
+        in between, and width of the columns is calculated from those rows
+        alone. All rows are rendered if it is None(Default None).
     """
 
     def __init__(
@@ -149,14 +182,26 @@ class BeautifulTable(object):
         max_width=80,
         default_alignment=enums.ALIGN_CENTER,
         default_padding=1,
+        columnar=False,
     ):
 
+        self._columnar = columnar
+        # Incremented whenever the table is modified
+        self._version = 0
+        self._string_cache = None
+        # Whether rows keep their formatted items, see `get_string`
+        self._cache_rows = False
+        # Horizontal lines already drawn for a given style and widths
+        self._horizontal_lines = {}
+
         self.set_style(enums.STYLE_DEFAULT)
 
         self.numeric_precision = 3
         self.serialno = False
         self.serialno_header = "SN"
         self.detect_numerics = True
+        self.strip_ansi_sequences = False
+        self.max_rows = None
 
         self._column_count = 0
         self._sign_mode = enums.SM_MINUS
@@ -167,7 +212,7 @@ class BeautifulTable(object):
         self.max_table_width = max_width
 
         self._initialize_table(0)
-        self._table = []
+        self._table = self._create_storage()
 
     def __setattr__(self, name, value):
         attrs = (
@@ -199,6 +244,8 @@ class BeautifulTable(object):
                 ).format(attr=name, attr_type=value_type)
             )
         super(BeautifulTable, self).__setattr__(name, value)
+        if not name.startswith("_"):
+            self._mutated()
 
     # ************************Properties Begin Here************************
 
@@ -353,6 +400,22 @@ class BeautifulTable(object):
         else:
             self._default_padding = value
 
+    @property
+    def max_rows(self):
+        """Maximum number of rows to render, all rows are rendered if None."""
+        return self._max_rows
+
+    @max_rows.setter
+    def max_rows(self, value):
+        if value is None:
+            self._max_rows = value
+        elif not isinstance(value, int):
+            raise TypeError("max_rows must be an integer or None")
+        elif value < 0:
+            raise ValueError("max_rows must be equal to or greater than 0")
+        else:
+            self._max_rows = value
+
     @property
     def column_widths(self):
         """get/set width for the columns of the table.
@@ -486,6 +549,8 @@ class BeautifulTable(object):
         self._column_widths = PositiveIntegerMetaData(self, width)
         self._left_padding_widths = PositiveIntegerMetaData(self, padding)
         self._right_padding_widths = PositiveIntegerMetaData(self, padding)
+        self._reset_width_stats()
+        self._mutated()
 
     def _validate_row(self, value, init_table_if_required=True):
         # TODO: Rename this method
@@ -527,19 +592,7 @@ class BeautifulTable(object):
             If `str` key is not found in headers.
         """
         if isinstance(key, slice):
-            new_table = copy.copy(self)
-            # Every child of BaseRow class needs to be reassigned so that
-            # They contain reference of the new table rather than the old
-            # This was a cause of a nasty bug once.
-            new_table.column_headers = self.column_headers
-            new_table.column_alignments = self.column_alignments
-            new_table.column_widths = self.column_widths
-            new_table.left_padding_widths = self.left_padding_widths
-            new_table.right_padding_widths = self.left_padding_widths
-            new_table._table = []
-            for row in self._table[key]:
-                new_table.append_row(row)
-            return new_table
+            return self._copy_rows(range(*key.indices(len(self._table))))
         if isinstance(key, int):
             return self._table[key]
         if isinstance(key, basestring):
@@ -550,6 +603,32 @@ class BeautifulTable(object):
             ).format(type(key).__name__)
         )
 
+    def _copy_rows(self, indices):
+        """Return a new table with copies of the rows at `indices`.
+
+        Rows of both tables share their items and cached formatting until
+        either of them is modified, so copying does not validate or format
+        any item again.
+        """
+        new_table = copy.copy(self)
+        new_table._reset_width_stats()
+        new_table._string_cache = None
+        # Every child of BaseRow class needs to be reassigned so that
+        # They contain reference of the new table rather than the old
+        # This was a cause of a nasty bug once.
+        new_table.column_headers = self.column_headers
+        new_table.column_alignments = self.column_alignments
+        new_table.column_widths = self.column_widths
+        new_table.left_padding_widths = self.left_padding_widths
+        new_table.right_padding_widths = self.right_padding_widths
+        if self._columnar:
+            new_table._table = self._table._copy(new_table, indices)
+        else:
+            new_table._table = [
+                self._table[index]._copy(new_table) for index in indices
+            ]
+        return new_table
+
     def __delitem__(self, key):
         """Delete a row, or a column, or multiple rows by slicing.
 
@@ -570,7 +649,10 @@ class BeautifulTable(object):
             If `str` key is not found in headers.
         """
         if isinstance(key, int) or isinstance(key, slice):
+            rows = self._table[key]
             del self._table[key]
+            self._forget_rows(rows if isinstance(key, slice) else [rows])
+            self._mutated()
         elif isinstance(key, basestring):
             return self.pop_column(key)
         else:
@@ -689,42 +771,44 @@ class BeautifulTable(object):
         self.intersect_bottom_mid = style_template.intersect_bottom_mid
         self.intersect_bottom_right = style_template.intersect_bottom_right
 
-    def _calculate_column_widths(self):
-        """Calculate width of column automatically based on data."""
+    def _calculate_column_widths(
+        self, serialno_width=None, rows=(), measure_table=True
+    ):
+        """Calculate width of column automatically based on data.
+
+        If `serialno_width`, the width of the widest serial number, is
+        given, a serial number column is taken into account as the first
+        column and it's width is returned. `rows` are rows not in the table
+        which should also be accounted for, and if `measure_table` is False
+        they are the only rows accounted for.
+        """
         table_width = self.get_table_width()
         lpw, rpw = self._left_padding_widths, self._right_padding_widths
         pad_widths = [(lpw[i] + rpw[i]) for i in range(self._column_count)]
         max_widths = [0 for index in range(self._column_count)]
         offset = table_width - sum(self._column_widths) + sum(pad_widths)
+
+        header_widths = self._column_headers._get_widths()
+        if measure_table:
+            data_widths = self._get_data_widths()
+        else:
+            data_widths = [0] * self._column_count
+        for row in rows:
+            data_widths = list(map(max, data_widths, row._get_widths()))
+        for index in range(self._column_count):
+            max_widths[index] = max(header_widths[index], data_widths[index])
+
+        if serialno_width is not None:
+            pad_widths.insert(0, 2 * self.default_padding)
+            max_widths.insert(0, serialno_width)
+            offset += termwidth(self.column_separator_char) + pad_widths[0]
+        column_count = len(max_widths)
+        column_widths = [0] * column_count
+
         self._max_table_width = max(
-            self._max_table_width, offset + self._column_count
+            self._max_table_width, offset + column_count
         )
 
-        for index, header in enumerate(self.column_headers):
-            max_length = 0
-            for i in to_unicode(self._column_headers[index]).split("\n"):
-                output_str = get_output_str(
-                    i,
-                    self.detect_numerics,
-                    self.numeric_precision,
-                    self.sign_mode.value,
-                )
-                max_length = max(max_length, termwidth(output_str))
-            max_widths[index] += max_length
-
-        for index, column in enumerate(zip(*self._table)):
-            max_length = max_widths[index]
-            for i in column:
-                for j in to_unicode(i).split("\n"):
-                    output_str = get_output_str(
-                        j,
-                        self.detect_numerics,
-                        self.numeric_precision,
-                        self.sign_mode.value,
-                    )
-                    max_length = max(max_length, termwidth(output_str))
-            max_widths[index] = max_length
-
         sum_ = sum(max_widths)
         desired_sum = self._max_table_width - offset
 
@@ -732,7 +816,7 @@ class BeautifulTable(object):
         temp_sum = 0
         flag = [0] * len(max_widths)
         for i, width in enumerate(max_widths):
-            if width <= int(desired_sum / self._column_count):
+            if width <= int(desired_sum / column_count):
                 temp_sum += width
                 flag[i] = 1
             else:
@@ -746,33 +830,174 @@ class BeautifulTable(object):
         # Columns which exceed their fair share should be shrinked based on
         # how much space is left for the table
         for i, width in enumerate(max_widths):
-            self.column_widths[i] = width
+            column_widths[i] = width
             if not flag[i]:
                 new_width = 1 + int((width - 1) * avail_space / actual_space)
                 if new_width < width:
-                    self.column_widths[i] = new_width
+                    column_widths[i] = new_width
                     shrinked_columns[new_width] = i
 
         # Divide any remaining space among shrinked columns
         if shrinked_columns:
-            extra = self._max_table_width - offset - sum(self.column_widths)
+            extra = self._max_table_width - offset - sum(column_widths)
             actual_space = sum(shrinked_columns)
 
             if extra > 0:
                 for i, width in enumerate(sorted(shrinked_columns)):
                     index = shrinked_columns[width]
                     extra_width = int(width * extra / actual_space)
-                    self.column_widths[i] += extra_width
+                    column_widths[i] += extra_width
                     if i == (len(shrinked_columns) - 1):
                         extra = (
-                            self._max_table_width
-                            - offset
-                            - sum(self.column_widths)
+                            self._max_table_width - offset - sum(column_widths)
                         )
-                        self.column_widths[index] += extra
+                        column_widths[index] += extra
+
+        for i in range(column_count):
+            column_widths[i] += pad_widths[i]
 
-        for i in range(self.column_count):
-            self.column_widths[i] += pad_widths[i]
+        if serialno_width is not None:
+            serialno_width = column_widths.pop(0)
+        for i, width in enumerate(column_widths):
+            self.column_widths[i] = width
+        return serialno_width
+
+    def _create_storage(self, column=None):
+        """Create an empty container for the rows of the table.
+
+        If `column` is given, the container holds a row for each of it's
+        items.
+        """
+        if self._columnar:
+            return ColumnStorage(self, [] if column is None else [column])
+        if column is None:
+            return []
+        return [RowData(self, [i]) for i in column]
+
+    def _create_row(self, row):
+        # Column oriented storage takes the items as they are
+        if self._columnar:
+            return row
+        return RowData(self, row)
+
+    def _mutated(self):
+        # Invalidates the output cached by `get_string`
+        self._version += 1
+
+    def _get_format_key(self):
+        # Attributes which affect how an item is formatted
+        return (self.detect_numerics, self.numeric_precision, self.sign_mode)
+
+    def _reset_width_stats(self):
+        # Width of the widest item in every column, `None` for columns which
+        # need to be measured again.
+        self._data_widths = [None] * self._column_count
+        self._data_widths_key = None
+        # Rows added since the widths were last brought up to date. Rows
+        # removed in the meantime are only flagged, see `_forget_rows`.
+        self._unmeasured_rows = []
+        self._forgotten_count = 0
+        self._has_nested_tables = False
+
+    def _column_modified(self, index):
+        self._data_widths[index] = None
+
+    def _track_rows(self, rows):
+        """Register rows added to the table for width statistics."""
+        if self._columnar:
+            return
+        for row in rows:
+            row._unmeasured = True
+        self._unmeasured_rows.extend(rows)
+
+    def _clear_unmeasured_rows(self):
+        for row in self._unmeasured_rows:
+            row._unmeasured = False
+        del self._unmeasured_rows[:]
+        self._forgotten_count = 0
+
+    def _forget_rows(self, rows):
+        """Update width statistics for rows removed from the table."""
+        if self._columnar:
+            return
+        widths = self._data_widths
+        measured = self._data_widths_key == self._get_format_key()
+        unmeasured_rows = self._unmeasured_rows
+        # Rows left in the table which are already measured
+        kept = len(self._table) - len(unmeasured_rows) + self._forgotten_count
+        if measured and len(rows) > kept:
+            # Measuring them again is cheaper than the rows removed
+            widths[:] = [None] * self._column_count
+            measured = False
+        for row in rows:
+            if row._unmeasured:
+                row._unmeasured = False
+                if unmeasured_rows[-1] is row:
+                    unmeasured_rows.pop()
+                else:
+                    self._forgotten_count += 1
+                continue
+            if not measured:
+                continue
+            # Columns where this row was the widest need to be measured again
+            for index, width in enumerate(row._get_widths()):
+                if widths[index] is not None and width >= widths[index]:
+                    widths[index] = None
+        # Don't hold on to too many removed rows
+        if self._forgotten_count * 2 > len(unmeasured_rows):
+            unmeasured_rows[:] = [i for i in unmeasured_rows if i._unmeasured]
+            self._forgotten_count = 0
+
+    def _measure_row(self, row, columns):
+        widths = self._data_widths
+        if len(columns) == self._column_count:
+            row_widths = enumerate(row._get_widths())
+        else:
+            # Only format the items of the columns being measured
+            row_widths = ((i, row._get_item_width(i)) for i in columns)
+        for index, width in row_widths:
+            if width > widths[index]:
+                widths[index] = width
+        if row._has_dynamic_items():
+            self._has_nested_tables = True
+
+    def _contains_nested_tables(self):
+        self._get_data_widths()
+        return self._has_nested_tables
+
+    def _get_data_widths(self):
+        """Return the width of the widest item of every column.
+
+        Only the rows added since the last call, and the columns which may
+        have shrunk, are measured.
+        """
+        if self._columnar:
+            # Column storage keeps track of widths by itself
+            if len(self._table) == 0:
+                return [0] * self._column_count
+            widths, self._has_nested_tables = self._table.get_widths()
+            return widths
+        widths = self._data_widths
+        key = self._get_format_key()
+        if key != self._data_widths_key or self._has_nested_tables:
+            # Items such as nested tables can change without notice
+            widths[:] = [None] * self._column_count
+        stale = [index for index, width in enumerate(widths) if width is None]
+        if len(stale) == self._column_count:
+            self._clear_unmeasured_rows()
+            self._has_nested_tables = False
+        for index in stale:
+            widths[index] = 0
+        if stale:
+            for row in self._table:
+                self._measure_row(row, stale)
+        all_columns = range(self._column_count)
+        for row in self._unmeasured_rows:
+            if row._unmeasured:
+                self._measure_row(row, all_columns)
+        self._clear_unmeasured_rows()
+        self._data_widths_key = key
+        return widths
 
     def auto_calculate_width(self):  # pragma : no cover
         deprecation("'auto_calculate_width()' is deprecated")
@@ -810,6 +1035,7 @@ class BeautifulTable(object):
                 "'key' must either be 'int' or 'str' or a 'callable'"
             )
         self._table.sort(key=key, reverse=reverse)
+        self._mutated()
 
     def copy(self):
         """Return a shallow copy of the table.
@@ -830,11 +1056,8 @@ class BeautifulTable(object):
         BeautifulTable:
             Filtered copy of the BeautifulTable instance.
         """
-        new_table = self.copy()
-        new_table.clear()
-        for row in filter(key, self):
-            new_table.append_row(row)
-        return new_table
+        indices = [index for index, row in enumerate(self) if key(row)]
+        return self._copy_rows(indices)
 
     def get_column_header(self, index):
         """Get header of a column from it's index.
@@ -898,11 +1121,14 @@ class BeautifulTable(object):
                     type(key).__name__
                 )
             )
+        if self._columnar:
+            return self._table.get_column(index)
         return iter(map(operator.itemgetter(index), self._table))
 
     def reverse(self):
         """Reverse the table row-wise *IN PLACE*."""
         self._table.reverse()
+        self._mutated()
 
     def pop_row(self, index=-1):
         """Remove and return row at index (default last).
@@ -913,6 +1139,8 @@ class BeautifulTable(object):
             index of the row. Normal list rules apply.
         """
         row = self._table.pop(index)
+        self._forget_rows([row])
+        self._mutated()
         return row
 
     def pop_column(self, index=-1):
@@ -956,8 +1184,12 @@ class BeautifulTable(object):
             self._left_padding_widths._pop(index)
             self._right_padding_widths._pop(index)
             self._column_headers._pop(index)
-            for row in self._table:
-                row._pop(index)
+            self._data_widths.pop(index)
+            if self._columnar:
+                self._table.pop_column(index)
+            else:
+                for row in self._table:
+                    row._pop(index)
 
     def insert_row(self, index, row):
         """Insert a row before index in the table.
@@ -980,8 +1212,10 @@ class BeautifulTable(object):
             of columns.
         """
         row = self._validate_row(row)
-        row_obj = RowData(self, row)
+        row_obj = self._create_row(row)
         self._table.insert(index, row_obj)
+        self._track_rows([row_obj])
+        self._mutated()
 
     def append_row(self, row):
         """Append a row to end of the table.
@@ -994,6 +1228,61 @@ class BeautifulTable(object):
         """
         self.insert_row(len(self._table), row)
 
+    def append_rows(self, rows, validate=True):
+        """Append multiple rows to end of the table.
+
+        Faster than calling `append_row` for every row, as the rows are
+        added to the table in one go. If any of the rows is invalid, none
+        of them are appended.
+
+        Parameters
+        ----------
+        rows : iterable
+            Any iterable of rows, each an iterable of appropriate length.
+
+        validate : bool, optional
+            If False, `rows` is trusted to be a sequence of lists or tuples
+            of appropriate length and is added as is(default True).
+
+        Raises
+        ------
+        TypeError:
+            If any of the rows is not an iterable.
+
+        ValueError:
+            If size of any of the rows is inconsistent with the current
+            number of columns.
+        """
+        if validate:
+            rows = self._validate_rows(rows)
+        elif self._column_count == 0 and len(rows) > 0:
+            self._initialize_table(len(rows[0]))
+        if len(rows) == 0:
+            return
+        if self._columnar:
+            self._table.extend(rows)
+        else:
+            row_objs = RowData._create_many(self, rows)
+            self._table.extend(row_objs)
+            self._track_rows(row_objs)
+        self._mutated()
+
+    def _validate_rows(self, rows):
+        """Validate multiple rows, see `_validate_row`."""
+        if not isinstance(rows, Iterable) or isinstance(rows, basestring):
+            raise TypeError("parameter must be an iterable")
+        rows = [
+            row if isinstance(row, (list, tuple)) else self._validate_row(row)
+            for row in rows
+        ]
+        if self._column_count == 0 and rows:
+            self._initialize_table(len(rows[0]))
+        # Lengths are checked in a single pass
+        if any(len(row) != self._column_count for row in rows):
+            for row in rows:
+                self._validate_row(row)
+        return rows
+
     def update_row(self, key, value):
         """Update a column named `header` in the table.
 
@@ -1023,16 +1312,23 @@ class BeautifulTable(object):
         """
         if isinstance(key, int):
             row = self._validate_row(value, init_table_if_required=False)
-            row_obj = RowData(self, row)
+            row_obj = self._create_row(row)
+            old_row = self._table[key]
             self._table[key] = row_obj
+            self._track_rows([row_obj])
+            self._forget_rows([old_row])
         elif isinstance(key, slice):
             row_obj_list = []
             for row in value:
                 row_ = self._validate_row(row, init_table_if_required=True)
-                row_obj_list.append(RowData(self, row_))
+                row_obj_list.append(self._create_row(row_))
+            old_rows = self._table[key]
             self._table[key] = row_obj_list
+            self._track_rows(row_obj_list)
+            self._forget_rows(old_rows)
         else:
             raise TypeError("key must be an integer or a slice object")
+        self._mutated()
 
     def update_column(self, header, column):
         """Update a column named `header` in the table.
@@ -1059,6 +1355,11 @@ class BeautifulTable(object):
         index = self.get_column_index(header)
         if not isinstance(header, basestring):
             raise TypeError("header must be of type str")
+        if self._columnar:
+            self._table.update_column(index, column)
+            self._column_modified(index)
+            self._mutated()
+            return
         for row, new_item in zip(self._table, column):
             row[index] = new_item
 
@@ -1094,25 +1395,31 @@ class BeautifulTable(object):
         """
         if self._column_count == 0:
             self.column_headers = HeaderData(self, [header])
-            self._table = [RowData(self, [i]) for i in column]
+            self._table = self._create_storage(column)
         else:
             if not isinstance(header, basestring):
                 raise TypeError("header must be of type str")
-            column_length = 0
-            for row, new_item in zip(self._table, column):
-                row._insert(index, new_item)
-                column_length += 1
+            if self._columnar:
+                # Column is only inserted if it's long enough
+                column_length = self._table.insert_column(index, column)
+            else:
+                column_length = 0
+                for row, new_item in zip(self._table, column):
+                    row._insert(index, new_item)
+                    column_length += 1
             if column_length == len(self._table):
                 self._column_count += 1
                 self._column_headers._insert(index, header)
                 self._column_alignments._insert(index, self.default_alignment)
                 self._column_widths._insert(index, 0)
+                self._data_widths.insert(index, None)
                 self._left_padding_widths._insert(index, self.default_padding)
                 self._right_padding_widths._insert(index, self.default_padding)
             else:
                 # Roll back changes so that table remains in consistent state
-                for j in range(column_length, -1, -1):
-                    self._table[j]._pop(index)
+                if not self._columnar:
+                    for j in range(column_length, -1, -1):
+                        self._table[j]._pop(index)
                 raise ValueError(
                     (
                         "length of 'column' should be atleast {}, " "got {}"
@@ -1147,30 +1454,70 @@ class BeautifulTable(object):
         """
         # Cannot use clear method to support Python 2.7
         del self._table[:]
+        self._reset_width_stats()
+        self._mutated()
         if clear_metadata:
             self._initialize_table(0)
 
     def _get_horizontal_line(
-        self, char, intersect_left, intersect_mid, intersect_right
+        self, char, intersect_left, intersect_mid, intersect_right, widths=None
     ):
         """Get a horizontal line for the table.
 
         Internal method used to actually get all horizontal lines in the table.
         Column width should be set prior to calling this method. This method
         detects intersection and handles it according to the values of
-        `intersect_*_*` attributes.
+        `intersect_*_*` attributes. Lines are drawn once for every
+        combination of style and column widths and reused afterwards.
 
         Parameters
         ----------
         char : str
             Character used to draw the line.
 
+        widths : list of int, optional
+            Widths of the columns to draw the line for. Defaults to
+            `column_widths`.
+
         Returns
         -------
         str
             String which will be printed as the Top border of the table.
         """
-        width = self.get_table_width()
+        if widths is None:
+            widths = self._column_widths
+        key = (
+            char,
+            intersect_left,
+            intersect_mid,
+            intersect_right,
+            self.left_border_char,
+            self.right_border_char,
+            self.column_separator_char,
+            tuple(widths),
+        )
+        try:
+            return self._horizontal_lines[key]
+        except KeyError:
+            pass
+        # Lines of stale widths or styles are of no use anymore
+        if len(self._horizontal_lines) >= 16:
+            self._horizontal_lines.clear()
+        line = self._draw_horizontal_line(
+            char, intersect_left, intersect_mid, intersect_right, widths
+        )
+        self._horizontal_lines[key] = line
+        return line
+
+    def _draw_horizontal_line(
+        self, char, intersect_left, intersect_mid, intersect_right, widths
+    ):
+        width = 0
+        if widths:
+            width = sum(widths)
+            width += (len(widths) - 1) * termwidth(self.column_separator_char)
+            width += termwidth(self.left_border_char)
+            width += termwidth(self.right_border_char)
 
         try:
             line = list(char * (int(width / termwidth(char)) + 1))[:width]
@@ -1208,8 +1555,8 @@ class BeautifulTable(object):
             if termwidth(self.column_separator_char):
                 if not (self.column_separator_char.isspace() and visible_junc):
                     index = termwidth(self.left_border_char)
-                    for i in range(self._column_count - 1):
-                        index += self._column_widths[i]
+                    for i in range(len(widths) - 1):
+                        index += widths[i]
                         length = min(
                             termwidth(self.column_separator_char),
                             termwidth(intersect_mid),
@@ -1220,12 +1567,13 @@ class BeautifulTable(object):
 
         return "".join(line)
 
-    def _get_top_border(self):
+    def _get_top_border(self, widths=None):
         return self._get_horizontal_line(
             self.top_border_char,
             self.intersect_top_left,
             self.intersect_top_mid,
             self.intersect_top_right,
+            widths,
         )
 
     def get_top_border(self):  # pragma : no cover
@@ -1241,12 +1589,13 @@ class BeautifulTable(object):
         deprecation("'get_top_border()' is deprecated")
         return self._get_top_border()
 
-    def _get_header_separator(self):
+    def _get_header_separator(self, widths=None):
         return self._get_horizontal_line(
             self.header_separator_char,
             self.intersect_header_left,
             self.intersect_header_mid,
             self.intersect_header_right,
+            widths,
         )
 
     def get_header_separator(self):  # pragma : no cover
@@ -1262,12 +1611,13 @@ class BeautifulTable(object):
         deprecation("'get_header_separator()' is deprecated")
         return self._get_header_separator()
 
-    def _get_row_separator(self):
+    def _get_row_separator(self, widths=None):
         return self._get_horizontal_line(
             self.row_separator_char,
             self.intersect_row_left,
             self.intersect_row_mid,
             self.intersect_row_right,
+            widths,
         )
 
     def get_row_separator(self):  # pragma : no cover
@@ -1283,12 +1633,13 @@ class BeautifulTable(object):
         deprecation("'get_row_separator()' is deprecated")
         return self._get_row_separator()
 
-    def _get_bottom_border(self):
+    def _get_bottom_border(self, widths=None):
         return self._get_horizontal_line(
             self.bottom_border_char,
             self.intersect_bottom_left,
             self.intersect_bottom_mid,
             self.intersect_bottom_right,
+            widths,
         )
 
     def get_bottom_border(self):  # pragma : no cover
@@ -1324,71 +1675,191 @@ class BeautifulTable(object):
         width += termwidth(self.right_border_char)
         return width
 
-    def _get_string(self, rows, append=False, recalculate_width=False):
-        # Drawing the top border
-        if self.serialno:
-            if self.column_count > 0:
-                self.insert_column(
-                    0, self.serialno_header, range(1, len(self) + 1)
-                )
+    def _get_layout(self, recalculate_width, sample=()):
+        """Return the layout to render rows with.
 
+        Width of the columns is calculated first if required, taking
+        `sample`, rows which are not in the table, into account.
+        """
+        # The serial number column is never added to the table, it is only
+        # drawn as part of the layout.
+        serialno = self.serialno and self.column_count > 0
+        header_width = 0
+        if serialno:
+            for line in to_unicode(self.serialno_header).split("\n"):
+                header_width = max(header_width, termwidth(line))
+
+        serialno_width = 0
         if recalculate_width or sum(self._column_widths) == 0:
-            self._calculate_column_widths()
-
-        if self.serialno:
-            if self.column_count > 0 and self.column_widths[0] == 0:
-                self.column_widths[0] = (
-                    max(4, len(self.serialno_header))
-                    + 2 * self.default_padding
+            # Only rows which are displayed need to be measured
+            measured = sample
+            displayed = self._get_displayed_rows()
+            if displayed is not None:
+                header_width = max(header_width, termwidth("..."))
+                head, tail = displayed
+                measured = head + tail + [self._get_ellipsis_row()] + sample
+            if serialno:
+                # Serial numbers are formatted like any other item
+                lines = self._column_headers._format_lines(
+                    len(self._table) + len(sample)
+                )
+                serialno_width = self._calculate_column_widths(
+                    max(header_width, max(map(termwidth, lines))),
+                    measured,
+                    displayed is None,
+                )
+            else:
+                self._calculate_column_widths(
+                    rows=measured, measure_table=displayed is None
                 )
+        elif serialno:
+            serialno_width = max(4, header_width) + 2 * self.default_padding
 
+        # Widths, alignments and paddings can't change while rendering
+        return RowLayout(self, serialno_width)
+
+    def _get_head(self, layout):
+        """Yield lines of the table preceding any streamed rows."""
+        widths = layout.column_widths
+
+        # Drawing the top border
         if self.top_border_char:
-            yield self._get_top_border()
+            yield self._get_top_border(widths)
 
         # Print headers if not empty or only spaces
-        if "".join(self._column_headers).strip():
-            headers = to_unicode(self._column_headers)
+        serialno_header = None
+        if layout.serialno_width:
+            serialno_header = self.serialno_header
+        if serialno_header or "".join(self._column_headers).strip():
+            headers = self._column_headers._render(layout, serialno_header)
             yield headers
 
             if self.header_separator_char:
-                yield self._get_header_separator()
+                yield self._get_header_separator(widths)
 
         # Printing rows
-        first_row_encountered = False
-        for row in self._table:
-            if first_row_encountered and self.row_separator_char:
-                yield self._get_row_separator()
-            first_row_encountered = True
-            content = to_unicode(row)
-            yield content
-
-        prev_length = len(self)
-        for i, row in enumerate(rows, start=1):
-            if first_row_encountered and self.row_separator_char:
-                yield self._get_row_separator()
-            first_row_encountered = True
-            if self.serialno:
-                row.insert(0, prev_length + i)
-            self.append_row(row)
-            content = to_unicode(self._table[-1])
-            if not append:
-                self.pop_row()
-            yield content
-
-        # Drawing the bottom border
-        if self.bottom_border_char:
-            yield self._get_bottom_border()
-
-        if self.serialno and self.column_count > 0:
-            self.pop_column(0)
-
-    def stream(self, rows, append=False):
+        displayed = self._get_displayed_rows()
+        if displayed is None:
+            for line in self._render_rows(self._table, 1, layout):
+                yield line
+            return
+        head, tail = displayed
+        for line in self._render_rows(head, 1, layout):
+            yield line
+        if head and self.row_separator_char:
+            yield self._get_row_separator(widths)
+        serialno = "..." if layout.serialno_width else None
+        yield self._get_ellipsis_row()._render(layout, serialno)
+        start = len(self) - len(tail) + 1
+        for line in self._render_rows(tail, start, layout):
+            yield line
+
+    def _get_displayed_rows(self):
+        """Return the leading and trailing rows to render.
+
+        `None` is returned if all rows are rendered.
+        """
+        count = len(self._table)
+        if self.max_rows is None or count <= self.max_rows:
+            return None
+        tail_start = count - self.max_rows // 2
+        head = list(self._table[: (self.max_rows + 1) // 2])
+        tail = list(self._table[tail_start:])
+        if self._columnar:
+            # Formatting a row view formats the whole storage
+            head = [RowData(self, row._row) for row in head]
+            tail = [RowData(self, row._row) for row in tail]
+        return head, tail
+
+    def _get_ellipsis_row(self):
+        # Drawn in place of the rows which are not rendered
+        return RowData(self, ["..."] * self._column_count)
+
+    def _render_rows(self, rows, start, layout):
+        """Yield rows numbered from `start` along with row separators."""
+        row_separator = None
+        if self.row_separator_char:
+            row_separator = self._get_row_separator(layout.column_widths)
+        serialno = layout.serialno_width > 0
+        for i, row in enumerate(rows, start=start):
+            if i > 1 and row_separator is not None:
+                yield row_separator
+            yield row._render(layout, i if serialno else None)
+
+    def _append_streamed(self, rows, keep_last):
+        """Append rows collected while streaming to the table."""
+        self.append_rows(list(rows), validate=False)
+        if keep_last is not None and len(self) > keep_last:
+            del self[: len(self) - keep_last]
+
+    def _get_string(
+        self,
+        rows,
+        append=False,
+        recalculate_width=False,
+        keep_last=None,
+        sample_size=None,
+        sample_time=None,
+    ):
+        # Streamed rows are validated and rendered on their own
+        rows = (RowData(self, self._validate_row(row)) for row in rows)
+        sample = []
+        if sample_size is not None or sample_time is not None:
+            sample = self._sample_rows(rows, sample_size, sample_time)
+            recalculate_width = True
+
+        layout = self._get_layout(recalculate_width, sample)
+        for line in self._get_head(layout):
+            yield line
+
+        # Streamed rows are only added to the table once the stream ends
+        streamed = collections.deque(maxlen=keep_last) if append else None
+        try:
+            rows = itertools.chain(sample, rows)
+            for i, row in enumerate(rows, start=len(self) + 1):
+                if streamed is not None:
+                    streamed.append(row._row)
+                for line in self._render_rows([row], i, layout):
+                    yield line
+
+            # Drawing the bottom border
+            if self.bottom_border_char:
+                yield self._get_bottom_border(layout.column_widths)
+        finally:
+            if streamed is not None:
+                self._append_streamed(streamed, keep_last)
+
+    def _sample_rows(self, rows, size, duration):
+        """Take the leading rows of `rows` to calculate widths from.
+
+        Rows are taken until there are `size` of them or `duration` seconds
+        have passed, whichever comes first.
+        """
+        sample = []
+        start = time.monotonic()
+        for row in rows:
+            sample.append(row)
+            if size is not None and len(sample) >= size:
+                break
+            if duration is not None and time.monotonic() - start >= duration:
+                break
+        return sample
+
+    def stream(
+        self,
+        rows,
+        append=False,
+        keep_last=None,
+        sample_size=None,
+        sample_time=None,
+    ):
         """Get a generator for the table.
 
         This should be used in cases where data takes time to retrieve and
         it is required be displayed as soon as possible. Any existing rows
         in the table shall also be returned. It is required that atleast one
-        of title, width or existing rows set prior to calling this method.
+        of title, width or existing rows set prior to calling this method,
+        unless `sample_size` or `sample_time` is given.
 
         Parameters
         ----------
@@ -1397,6 +1868,22 @@ class BeautifulTable(object):
 
         append : bool, optional
             If rows should also be appended to the table.(Default False)
+            Rows are appended once the generator is exhausted or closed.
+
+        keep_last : int, optional
+            If `append` is True, the number of rows retained by the table,
+            dropping the oldest ones. All rows are retained if it is
+            None(Default None).
+
+        sample_size : int, optional
+            If given, the first `sample_size` rows are retrieved before
+            anything is yielded, and width of the columns is calculated
+            from them along with the existing rows(Default None).
+
+        sample_time : float, optional
+            Same as `sample_size`, but rows are retrieved for at most
+            `sample_time` seconds. If both are given, sampling stops at
+            whichever limit is reached first(Default None).
 
         Returns
         -------
@@ -1404,10 +1891,102 @@ class BeautifulTable(object):
             string representation of the table as a generators
         """
         for line in self._get_string(
-            rows, append=append, recalculate_width=False
+            rows,
+            append=append,
+            recalculate_width=False,
+            keep_last=keep_last,
+            sample_size=sample_size,
+            sample_time=sample_time,
         ):
             yield line
 
+    def astream(
+        self,
+        rows,
+        append=False,
+        keep_last=None,
+        sample_size=None,
+        sample_time=None,
+    ):
+        """Get an asynchronous generator for the table.
+
+        Same as `stream`, but `rows` can also be an asynchronous iterable,
+        such as the rows returned by an asynchronous database driver.
+        Requires python 3.6 or later.
+
+        Parameters
+        ----------
+        rows : iterable or asynchronous iterable
+            Any iterable which yields one row at a time.
+
+        append, keep_last, sample_size, sample_time
+            See `stream`.
+
+        Returns
+        -------
+        asynchronous iterable:
+            string representation of the table as an asynchronous generator
+        """
+        aio = _import_aio("astream")
+        return aio.astream(
+            self,
+            rows,
+            append=append,
+            keep_last=keep_last,
+            sample_size=sample_size,
+            sample_time=sample_time,
+        )
+
+    def astream_to(
+        self,
+        writer,
+        rows=(),
+        append=False,
+        keep_last=None,
+        sample_size=None,
+        sample_time=None,
+        buffer_size=65536,
+        encoding="utf-8",
+    ):
+        """Write the table to an `asyncio.StreamWriter`.
+
+        Lines generated by `astream` are encoded and written in chunks of
+        about `buffer_size` characters. `drain` is awaited after each chunk,
+        so that output is not buffered faster than it is consumed. Must be
+        awaited, and requires python 3.6 or later.
+
+        Parameters
+        ----------
+        writer : asyncio.StreamWriter
+            Any object with a `write` method accepting bytes and a `drain`
+            coroutine method.
+
+        rows : iterable or asynchronous iterable, optional
+            Rows to stream after the existing rows(default ()).
+
+        append, keep_last, sample_size, sample_time
+            See `stream`.
+
+        buffer_size : int, optional
+            Number of characters to accumulate before each
+            write(default 65536).
+
+        encoding : str, optional
+            Encoding of the output(default 'utf-8').
+        """
+        aio = _import_aio("astream_to")
+        return aio.write_to(
+            self,
+            writer,
+            rows,
+            append=append,
+            keep_last=keep_last,
+            sample_size=sample_size,
+            sample_time=sample_time,
+            buffer_size=buffer_size,
+            encoding=encoding,
+        )
+
     def get_string(self, recalculate_width=True):
         """Get the table as a String.
 
@@ -1428,13 +2007,113 @@ class BeautifulTable(object):
         if len(self._table) == 0:
             return ""
 
+        cached = self._get_cached_string(recalculate_width)
+        if cached is not None:
+            return cached
+
         string_ = []
-        for line in self._get_string(
+        # Rows keep their formatted items so that rendering again after a
+        # modification only formats the modified rows. Streaming is meant
+        # for tables too large for that, so it is only done here.
+        self._cache_rows = not self._columnar
+        try:
+            for line in self._get_string(
+                [], append=False, recalculate_width=recalculate_width
+            ):
+                string_.append(line)
+        finally:
+            self._cache_rows = False
+
+        string_ = "\n".join(string_)
+        self._string_cache = (self._version, recalculate_width, string_)
+        return string_
+
+    def _get_cached_string(self, recalculate_width):
+        # Output is reused as long as the table is not modified. Items such
+        # as nested tables can change without notice, so they disable the
+        # cache.
+        cache = self._string_cache
+        if cache is not None and cache[:2] == (
+            self._version,
+            recalculate_width,
+        ):
+            displayed = self._get_displayed_rows()
+            if displayed is None:
+                nested = self._contains_nested_tables()
+            else:
+                nested = any(
+                    row._has_dynamic_items()
+                    for row in itertools.chain(*displayed)
+                )
+            if not nested:
+                return cache[2]
+        return None
+
+    def iter_lines(self, recalculate_width=True):
+        """Get a generator for the lines of the table.
+
+        Unlike `get_string`, the table is rendered as it is iterated, so
+        the whole output is never held in memory.
+
+        Parameters
+        ----------
+        recalculate_width : bool, optional
+            If width for each column should be recalculated(default True).
+
+        Returns
+        -------
+        iterable:
+            Lines of the table, without trailing newlines.
+        """
+        if len(self._table) == 0:
+            return
+        for content in self._get_string(
             [], append=False, recalculate_width=recalculate_width
         ):
-            string_.append(line)
+            for line in content.split("\n"):
+                yield line
+
+    def render_to(self, fileobj, recalculate_width=True, buffer_size=65536):
+        """Write the table to a file object.
+
+        The table is rendered and written in chunks of about `buffer_size`
+        characters, so the whole output is never held in memory. The
+        output is the same as that of `get_string`, followed by a newline.
+        Nothing is written if the table is empty.
+
+        Parameters
+        ----------
+        fileobj : file-like object
+            Any object with a `write` method accepting strings.
+
+        recalculate_width : bool, optional
+            If width for each column should be recalculated(default True).
 
-        return "\n".join(string_)
+        buffer_size : int, optional
+            Number of characters to accumulate before each
+            write(default 65536).
+        """
+        if len(self._table) == 0:
+            return
+        cached = self._get_cached_string(recalculate_width)
+        if cached is not None:
+            fileobj.write(cached + "\n")
+            return
+        buffer = []
+        size = 0
+        for content in self._get_string(
+            [], append=False, recalculate_width=recalculate_width
+        ):
+            buffer.append(content)
+            size += len(content) + 1
+            if size >= buffer_size:
+                buffer.append("")
+                fileobj.write("\n".join(buffer))
+                buffer = []
+                size = 0
+        if buffer:
+            buffer.append("")
+            fileobj.write("\n".join(buffer))
 
     def to_csv(self, file_name, delimiter=","):
         """Export table to CSV format.
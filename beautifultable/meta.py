@@ -3,6 +3,8 @@ from .enums import Alignment
 
 
 class TableMetaData(BaseRow):
+    __slots__ = ()
+
     def __init__(self, table, row):
         for i in row:
             self.validate(i)
@@ -17,6 +19,8 @@ class TableMetaData(BaseRow):
 
 
 class AlignmentMetaData(TableMetaData):
+    __slots__ = ()
+
     def validate(self, value):
         if not isinstance(value, Alignment):
             allowed = (
@@ -31,6 +35,8 @@ class AlignmentMetaData(TableMetaData):
 
 
 class PositiveIntegerMetaData(TableMetaData):
+    __slots__ = ()
+
     def validate(self, value):
         if isinstance(value, int) and value >= 0:
             pass
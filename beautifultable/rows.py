@@ -1,168 +1,354 @@
 from __future__ import unicode_literals
-from .utils import get_output_str, termwidth, textwrap
+from .ansi import minimize_ansi, strip_ansi
+from .utils import get_output_str, termwidth, iter_textwrap, truncate
+from .utils import raise_suppressed, split_lines
 from .base import BaseRow
 from .enums import WidthExceedPolicy
 from .compat import basestring, to_unicode, zip_longest
 
+# Items of these types always render the same way. Any other object, such as
+# a nested table or a list, can change without the row knowing, and is
+# formatted again on every use.
+STATIC_TYPES = (str, int, float, bool, type(None))
+
 
 class RowData(BaseRow):
-    def _get_row_within_width(self, row):
-        """Process a row so that it is clamped by column_width.
+    __slots__ = (
+        "_typed",
+        "_widths",
+        "_lines",
+        "_format_key",
+        "_unmeasured",
+    )
 
-        Parameters
-        ----------
-        row : array_like
-             A single row.
+    def __init__(self, table, row):
+        super(RowData, self).__init__(table, row)
+        if table.strip_ansi_sequences:
+            self._row = tuple(self._sanitize(item) for item in self._row)
+        # Converted and formatted items, see `_get_typed` and `_get_formatted`
+        self._typed = None
+        self._widths = None
+        self._lines = None
+        self._format_key = None
+        # Whether the table has yet to account for the width of this row
+        self._unmeasured = False
 
-        Returns
-        -------
-        list of list:
-            List representation of the `row` after it has been processed
-            according to width exceed policy.
+    def _changed(self):
+        super(RowData, self)._changed()
+        self._typed = None
+        self._widths = None
+        self._lines = None
+
+    def _copy(self, table):
+        """Return a copy of the row for `table`.
+
+        Items and formatted items are stored in tuples which are replaced
+        rather than modified, so both rows can share them.
         """
-        table = self._table
-        lpw, rpw = table.left_padding_widths, table.right_padding_widths
-        wep = table.width_exceed_policy
+        row = RowData.__new__(RowData)
+        row._table = table
+        row._row = self._row
+        row._typed = self._typed
+        row._widths = self._widths
+        row._lines = self._lines
+        row._format_key = self._format_key
+        row._unmeasured = False
+        return row
 
-        list_of_rows = []
+    @classmethod
+    def _create_many(cls, table, rows):
+        """Return a row of `table` for each item of `rows`.
 
-        if (
-            wep is WidthExceedPolicy.WEP_STRIP
-            or wep is WidthExceedPolicy.WEP_ELLIPSIS
-        ):
+        Equivalent to creating the rows one by one, but skips the per row
+        overhead of `__init__`.
+        """
+        if table.strip_ansi_sequences:
+            return [cls(table, row) for row in rows]
+        new = cls.__new__
+        row_objs = []
+        append = row_objs.append
+        for row in rows:
+            row_obj = new(cls)
+            row_obj._table = table
+            row_obj._row = tuple(row)
+            row_obj._typed = None
+            row_obj._widths = None
+            row_obj._lines = None
+            row_obj._format_key = None
+            row_obj._unmeasured = False
+            append(row_obj)
+        return row_objs
 
-            # Let's strip the row
-            delimiter = "" if wep is WidthExceedPolicy.WEP_STRIP else "..."
-            row_item_list = []
-            for index, row_item in enumerate(row):
-                left_pad = table._column_pad * lpw[index]
-                right_pad = table._column_pad * rpw[index]
-                clmp_str = (
-                    left_pad
-                    + self._clamp_string(row_item, index, delimiter)
-                    + right_pad
-                )
-                row_item_list.append(clmp_str)
-            list_of_rows.append(row_item_list)
-        elif wep is WidthExceedPolicy.WEP_WRAP:
-
-            # Let's wrap the row
-            string_partition = []
-
-            for index, row_item in enumerate(row):
-                width = table.column_widths[index] - lpw[index] - rpw[index]
-                string_partition.append(textwrap(row_item, width))
-
-            for row_items in zip_longest(*string_partition, fillvalue=""):
-                row_item_list = []
-                for index, row_item in enumerate(row_items):
-                    left_pad = table._column_pad * lpw[index]
-                    right_pad = table._column_pad * rpw[index]
-                    row_item_list.append(left_pad + row_item + right_pad)
-                list_of_rows.append(row_item_list)
-
-        if len(list_of_rows) == 0:
-            return [[""] * table.column_count]
-        else:
-            return list_of_rows
+    def _sanitize(self, item):
+        """Remove escape sequences from `item` if the table requires so."""
+        if self._table.strip_ansi_sequences and isinstance(item, str):
+            return strip_ansi(item)
+        return item
 
-    def _clamp_string(self, row_item, column_index, delimiter=""):
-        """Clamp `row_item` to fit in column referred by column_index.
+    def __setitem__(self, key, value):
+        super(RowData, self).__setitem__(key, self._sanitize(value))
+        if isinstance(key, basestring):
+            key = self._table.get_column_index(key)
+        self._table._column_modified(key)
 
-        This method considers padding and appends the delimiter if `row_item`
-        needs to be truncated.
+    def _has_dynamic_items(self):
+        """Return whether any item is not of a `STATIC_TYPES` type."""
+        return not all(isinstance(item, STATIC_TYPES) for item in self._row)
 
-        Parameters
-        ----------
-        row_item: str
-            String which should be clamped.
+    def _format_lines(self, item, key=None):
+        """Split `item` into lines formatted as per the table.
 
-        column_index: int
-            Index of the column `row_item` belongs to.
+        `key` is the format key of the table, if already known.
+        """
+        if key is None:
+            key = self._table._get_format_key()
+        return self._format_typed(split_lines(item, key[0]), key)
 
-        delimiter: str
-            String which is to be appended to the clamped string.
+    def _format_typed(self, lines, key):
+        """Format `lines` of an item already converted as per `key`."""
+        _, precision, sign = key
+        # Strings are output as is, there is no need to format them
+        return [
+            (
+                line
+                if isinstance(line, str)
+                else get_output_str(line, False, precision, sign.value)
+            )
+            for line in lines
+        ]
 
-        Returns
-        -------
-        str
-            The modified string which fits in it's column.
+    def _get_typed(self):
+        """Return the items with numeric strings converted.
+
+        Items with a single line are converted to a number if possible,
+        and items with multiple lines to a tuple of lines converted
+        likewise. `None` is returned in place of items which are not of a
+        `STATIC_TYPES` type. If no item needs to be converted, the items
+        themselves are returned.
+
+        The result is stored along with the formatted items, and reused
+        until the row is modified.
         """
-        width = (
-            self._table.column_widths[column_index]
-            - self._table.left_padding_widths[column_index]
-            - self._table.right_padding_widths[column_index]
-        )
-
-        if termwidth(row_item) <= width:
-            return row_item
+        if self._typed is not None:
+            return self._typed
+        typed = []
+        for item in self._row:
+            if type(item) is int or type(item) is float:
+                typed.append(item)
+            elif isinstance(item, STATIC_TYPES):
+                lines = split_lines(item, True)
+                typed.append(lines[0] if len(lines) == 1 else tuple(lines))
+            else:
+                typed.append(None)
+        if all(value is item for value, item in zip(typed, self._row)):
+            typed = self._row
         else:
-            if width - len(delimiter) >= 0:
-                clamped_string = (
-                    textwrap(row_item, width - len(delimiter))[0] + delimiter
-                )
+            typed = tuple(typed)
+        if self._table._cache_rows:
+            self._typed = typed
+        return typed
+
+    def _split_typed(self, value, detect_numerics):
+        """Return lines of an item given it's value from `_get_typed`.
+
+        If `detect_numerics` is False, `value` is the item itself.
+        """
+        if not detect_numerics:
+            return to_unicode(value).split("\n")
+        return value if isinstance(value, tuple) else (value,)
+
+    def _get_formatted(self):
+        """Return the width of every item and the lines of some of them.
+
+        Widths are `-1` for items which are not of a `STATIC_TYPES` type, as
+        they can change without the row knowing. Lines are only kept for
+        items which are output differently from `str(item)`, a single line
+        as a string and multiple lines as a tuple, and `None` is kept for
+        the others, or in place of the tuple if there are no such items.
+
+        The result is stored while the table is rendered by `get_string`,
+        and reused until the row is modified or the table's
+        `detect_numerics`, `numeric_precision` or `sign_mode` is changed.
+        Items are converted only once regardless, see `_get_typed`.
+        """
+        key = self._table._get_format_key()
+        if self._widths is not None and self._format_key == key:
+            return self._widths, self._lines
+        widths = []
+        lines = []
+        typed = self._get_typed() if key[0] else self._row
+        for item, value in zip(self._row, typed):
+            if not isinstance(item, STATIC_TYPES):
+                widths.append(-1)
+                lines.append(None)
+                continue
+            item_lines = self._split_typed(value, key[0])
+            item_lines = self._format_typed(item_lines, key)
+            widths.append(max(map(termwidth, item_lines)))
+            if len(item_lines) > 1:
+                lines.append(tuple(item_lines))
+            elif item_lines[0] != to_unicode(item):
+                lines.append(item_lines[0])
             else:
-                clamped_string = delimiter[:width]
-            return clamped_string
+                lines.append(None)
+        widths = tuple(widths)
+        if all(i is None for i in lines):
+            lines = None
+        else:
+            lines = tuple(lines)
+        if self._table._cache_rows:
+            self._widths = widths
+            self._lines = lines
+            self._format_key = key
+        return widths, lines
 
-    def __str__(self):
-        """Return a string representation of a row."""
-        rows = []
+    def _get_widths(self):
+        """Return the width of the widest line of every item."""
+        widths = list(self._get_formatted()[0])
+        for index, width in enumerate(widths):
+            if width < 0:
+                lines = self._format_lines(self._row[index])
+                widths[index] = max(map(termwidth, lines))
+        return widths
+
+    def _get_item_width(self, index):
+        """Return the width of the widest line of the item at `index`.
+
+        Only that item is formatted, unless the whole row is formatted
+        anyway to be stored.
+        """
         table = self._table
-        width = table.column_widths
-        align = table.column_alignments
-        sign = table.sign_mode
-        lpw = table.left_padding_widths
-        rpw = table.right_padding_widths
-        string = []
+        key = table._get_format_key()
+        item = self._row[index]
+        if not isinstance(item, STATIC_TYPES):
+            return max(map(termwidth, self._format_lines(item, key)))
+        if table._cache_rows or (
+            self._widths is not None and self._format_key == key
+        ):
+            return self._get_formatted()[0][index]
+        if key[0] and self._typed is not None:
+            lines = self._split_typed(self._typed[index], True)
+        else:
+            lines = split_lines(item, key[0])
+        return max(map(termwidth, self._format_typed(lines, key)))
+
+    def _insert(self, i, item):
+        super(RowData, self)._insert(i, self._sanitize(item))
+
+    def _render(self, layout, serialno=None):
+        """Return a string representation of a row laid out by `layout`.
+
+        `serialno` is the item shown in the serial number column, and must
+        be given if the layout has one.
+        """
+        lines = []
+        widths = []
+        if serialno is not None:
+            lines.append(self._format_lines(serialno))
+            widths.append([termwidth(line) for line in lines[0]])
+        offset = len(lines)
+        item_widths, formatted = self._get_formatted()
         for i, item in enumerate(self._row):
-            if isinstance(item, type(table)):
+            cached = None if formatted is None else formatted[i]
+            if item_widths[i] >= 0:
+                if cached is None:
+                    lines.append((to_unicode(item),))
+                    widths.append((item_widths[i],))
+                elif isinstance(cached, tuple):
+                    lines.append(cached)
+                    widths.append([termwidth(line) for line in cached])
+                else:
+                    lines.append((cached,))
+                    widths.append((item_widths[i],))
+                continue
+            if isinstance(item, type(self._table)):
                 # temporarily change the max width of the table
                 curr_max_width = item.max_table_width
-                item.max_table_width = width[i] - lpw[i] - rpw[i]
-                rows.append(to_unicode(item).split("\n"))
+                item.max_table_width = layout.get_item_width(i + offset)
+                item_lines = self._format_lines(item)
                 item.max_table_width = curr_max_width
             else:
-                rows.append(to_unicode(item).split("\n"))
-        for row in map(list, zip_longest(*rows, fillvalue="")):
-            for i in range(len(row)):
-                row[i] = get_output_str(
-                    row[i],
-                    table.detect_numerics,
-                    table.numeric_precision,
-                    sign.value,
-                )
-            list_of_rows = self._get_row_within_width(row)
-            for row_ in list_of_rows:
-                for i in range(table.column_count):
-                    # str.format method doesn't work for multibyte strings
-                    # hence, we need to manually align the texts instead
-                    # of using the align property of the str.format method
-                    pad_len = width[i] - termwidth(row_[i])
-                    if align[i].value == "<":
-                        right_pad = " " * pad_len
-                        row_[i] = to_unicode(row_[i]) + right_pad
-                    elif align[i].value == ">":
-                        left_pad = " " * pad_len
-                        row_[i] = left_pad + to_unicode(row_[i])
-                    else:
-                        left_pad = " " * (pad_len // 2)
-                        right_pad = " " * (pad_len - pad_len // 2)
-                        row_[i] = left_pad + to_unicode(row_[i]) + right_pad
-                content = table.column_separator_char.join(row_)
-                content = table.left_border_char + content
-                content += table.right_border_char
-                string.append(content)
-        return "\n".join(string)
+                item_lines = self._format_lines(item)
+            lines.append(item_lines)
+            widths.append([termwidth(line) for line in item_lines])
+        return "\n".join(layout.format_row(lines, widths))
+
+    def __str__(self):
+        """Return a string representation of a row."""
+        return self._render(RowLayout(self._table))
+
+
+class RowView(RowData):
+    """Row of a table which keeps it's items in a `ColumnStorage`.
+
+    Items are read from and written to the storage, the view itself only
+    refers to the position of the row in the table.
+    """
+
+    __slots__ = ("_storage", "_index")
+
+    def __init__(self, storage, index):
+        self._table = storage._table
+        self._storage = storage
+        self._index = index
+        self._typed = None
+        self._widths = None
+        self._lines = None
+        self._format_key = None
+        self._unmeasured = False
+
+    @property
+    def _row(self):
+        return self._storage._get_row(self._index)
+
+    @_row.setter
+    def _row(self, row):
+        self._storage._set_row(self._index, row)
 
 
 class HeaderData(RowData):
+    __slots__ = ("_indices",)
+
     def __init__(self, table, row):
         for i in row:
             self.validate(i)
         RowData.__init__(self, table, row)
+        self._indices = None
+
+    def _changed(self):
+        super(HeaderData, self)._changed()
+        self._indices = None
+
+    def _get_indices(self):
+        """Return a mapping of every header to it's index.
+
+        If a header is used by multiple columns, it maps to the first one.
+        The mapping is rebuilt only after headers are modified.
+        """
+        if self._indices is None:
+            indices = {}
+            for index, header in enumerate(self._row):
+                indices.setdefault(header, index)
+            self._indices = indices
+        return self._indices
+
+    def __contains__(self, header):
+        try:
+            return header in self._get_indices()
+        except TypeError:
+            return False
+
+    def index(self, header, *args):
+        if args:
+            return super(HeaderData, self).index(header, *args)
+        try:
+            return self._get_indices()[header]
+        except (KeyError, TypeError):
+            raise_suppressed(ValueError("{!r} is not in list".format(header)))
 
     def __getitem__(self, key):
+        if isinstance(key, slice):
+            return list(self._row[key])
         return self._row[key]
 
     def __setitem__(self, key, value):
@@ -173,7 +359,8 @@ class HeaderData(RowData):
                     type(key).__name__
                 )
             )
-        self._row[key] = value
+        self._set(key, self._sanitize(value))
+        self._changed()
 
     def validate(self, value):
         if not isinstance(value, basestring):
@@ -182,3 +369,125 @@ class HeaderData(RowData):
                     type(value).__name__
                 )
             )
+
+
+class RowLayout(object):
+    """Layout of the rows of a table, compiled from its current state.
+
+    Column widths, alignments, paddings and border characters are read
+    once when the layout is created, so that it can be used to format any
+    number of rows as long as the table is not modified in the meantime.
+
+    If `serialno_width` is non zero, a serial number column of that width
+    is laid out before the columns of the table.
+    """
+
+    def __init__(self, table, serialno_width=0):
+        self.serialno_width = serialno_width
+        self.column_widths = list(table.column_widths)
+        lpw = list(table.left_padding_widths)
+        rpw = list(table.right_padding_widths)
+        alignments = list(table.column_alignments)
+        if serialno_width:
+            self.column_widths.insert(0, serialno_width)
+            lpw.insert(0, table.default_padding)
+            rpw.insert(0, table.default_padding)
+            alignments.insert(0, table.default_alignment)
+        self._count = len(self.column_widths)
+        self._wrap = table.width_exceed_policy is WidthExceedPolicy.WEP_WRAP
+        if table.width_exceed_policy is WidthExceedPolicy.WEP_ELLIPSIS:
+            self._delimiter = "..."
+        else:
+            self._delimiter = ""
+        self._item_widths = [
+            width - lpw[i] - rpw[i]
+            for i, width in enumerate(self.column_widths)
+        ]
+        self._columns = [
+            (
+                self._item_widths[i],
+                table._column_pad * lpw[i],
+                table._column_pad * rpw[i],
+                alignments[i].value,
+            )
+            for i in range(self._count)
+        ]
+        self._separator = table.column_separator_char
+        self._left_border = table.left_border_char
+        self._right_border = table.right_border_char
+
+    def get_item_width(self, index):
+        """Return the width available to items of column `index`."""
+        return self._item_widths[index]
+
+    def format_row(self, lines, widths):
+        """Lay out a row whose items are already split into lines.
+
+        Parameters
+        ----------
+        lines : list of list of str
+            Formatted lines of every item of the row.
+
+        widths : list of list of int
+            Width of every line in `lines`.
+
+        Returns
+        -------
+        list of str
+            Lines of the row, including borders and column separators.
+        """
+        wrap = self._wrap
+        item_widths = self._item_widths
+        output = []
+        cells = [list(zip(*pair)) for pair in zip(lines, widths)]
+        for line in zip_longest(*cells, fillvalue=("", 0)):
+            for (text, width), item_width in zip(line, item_widths):
+                # Wrapping also rewrites escape sequences of an item
+                if width > item_width or (wrap and "\x1b" in text):
+                    output.extend(self._join(i) for i in self._fit(line))
+                    break
+            else:
+                output.append(self._join(line))
+        return output
+
+    def _fit(self, line):
+        """Clamp or wrap items of `line` as per the width exceed policy."""
+        item_widths = self._item_widths
+        if self._wrap:
+            partition = [
+                iter_textwrap(text, width)
+                for (text, _), width in zip(line, item_widths)
+            ]
+            lines = [
+                [(text, termwidth(text)) for text in items]
+                for items in zip_longest(*partition, fillvalue="")
+            ]
+            return lines or [[("", 0)] * self._count]
+        items = []
+        for (text, _), width in zip(line, item_widths):
+            text = truncate(text, width, self._delimiter)
+            items.append((text, termwidth(text)))
+        return [items]
+
+    def _join(self, line):
+        """Pad and align items of `line` and join them into a string."""
+        items = []
+        for (text, width), column in zip(line, self._columns):
+            item_width, left_pad, right_pad, align = column
+            # str.format method doesn't work for multibyte strings
+            # hence, we need to manually align the texts instead
+            # of using the align property of the str.format method
+            pad_len = item_width - width
+            if align == "<":
+                items.append(left_pad + text + right_pad + " " * pad_len)
+            elif align == ">":
+                items.append(" " * pad_len + left_pad + text + right_pad)
+            else:
+                left = " " * (pad_len // 2)
+                right = " " * (pad_len - pad_len // 2)
+                items.append(left + left_pad + text + right_pad + right)
+        content = self._left_border
+        content += self._separator.join(items)
+        content += self._right_border
+        # Coalesce the escape sequences of adjacent cells
+        return minimize_ansi(content)
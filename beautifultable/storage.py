@@ -0,0 +1,271 @@
+"""Module containing the column oriented storage of a table"""
+
+from __future__ import unicode_literals
+import itertools
+
+from .ansi import strip_ansi
+from .rows import STATIC_TYPES, RowData, RowView
+from .utils import get_output_str, split_lines, termwidth
+
+
+class ColumnStorage(object):
+    """Items of a table stored as one list per column.
+
+    Implements the list operations `BeautifulTable` performs on its rows,
+    handing out `RowView` objects in place of `RowData`. The width of the
+    widest item of every column is kept up to date as rows are added and
+    removed, so that only new rows need to be measured.
+    """
+
+    def __init__(self, table, columns=()):
+        self._table = table
+        self._columns = [
+            [self._sanitize(item) for item in column] for column in columns
+        ]
+        if not self._columns:
+            self._columns = [[] for i in range(table.column_count)]
+        self._format_key = None
+        self._reset_widths()
+
+    def _reset_widths(self):
+        # Width of the widest item of every column among its leading
+        # `_measured` items, `None` for columns which need to be measured
+        # again. `_dynamic` flags columns with items such as nested tables,
+        # which are measured on every use.
+        self._measured = 0
+        self._max_widths = [0] * len(self._columns)
+        self._dynamic = [False] * len(self._columns)
+
+    def _sanitize(self, item):
+        if self._table.strip_ansi_sequences and isinstance(item, str):
+            return strip_ansi(item)
+        return item
+
+    def _measure(self, items):
+        """Return the width of the widest item of `items`.
+
+        Also returns whether any of them is not of a `STATIC_TYPES` type.
+        """
+        detect_numerics, precision, sign = self._format_key
+        width = 0
+        dynamic = False
+        for item in items:
+            if not isinstance(item, STATIC_TYPES):
+                dynamic = True
+            for line in split_lines(item, detect_numerics):
+                line = get_output_str(line, False, precision, sign.value)
+                width = max(width, termwidth(line))
+        return width, dynamic
+
+    def _add_item(self, column, item):
+        """Account for `item` being added to the measured part of `column`."""
+        width = self._max_widths[column]
+        if width is not None:
+            item_width, dynamic = self._measure([item])
+            self._max_widths[column] = max(width, item_width)
+            self._dynamic[column] = self._dynamic[column] or dynamic
+
+    def _remove_item(self, column, item):
+        """Account for `item` leaving the measured part of `column`."""
+        width = self._max_widths[column]
+        if width is not None and self._measure([item])[0] >= width:
+            # It may have been the widest item
+            self._max_widths[column] = None
+
+    def _copy(self, table, indices):
+        """Return a storage for `table` with the rows at `indices`."""
+        storage = ColumnStorage(table, [])
+        storage._columns = [
+            [column[index] for index in indices] for column in self._columns
+        ]
+        storage._reset_widths()
+        return storage
+
+    def _get_index(self, index):
+        length = len(self)
+        if index < 0:
+            index += length
+        if not 0 <= index < length:
+            raise IndexError("list index out of range")
+        return index
+
+    def _get_row(self, index):
+        return tuple(column[index] for column in self._columns)
+
+    def _set_row(self, index, row):
+        row = [self._sanitize(item) for item in row]
+        measured = index < self._measured
+        for i, (column, item) in enumerate(zip(self._columns, row)):
+            if measured:
+                self._remove_item(i, column[index])
+                self._add_item(i, item)
+            column[index] = item
+
+    def __len__(self):
+        return len(self._columns[0]) if self._columns else 0
+
+    def __iter__(self):
+        return (RowView(self, index) for index in range(len(self)))
+
+    def __contains__(self, row):
+        return any(view == row for view in self)
+
+    def __repr__(self):
+        return repr(list(self))
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return [RowView(self, i) for i in range(*key.indices(len(self)))]
+        return RowView(self, self._get_index(key))
+
+    def __setitem__(self, key, value):
+        if isinstance(key, slice):
+            rows = [[self._sanitize(item) for item in row] for row in value]
+            start = min(range(*key.indices(len(self))), default=None)
+            if start is None:
+                start = key.indices(len(self))[0]
+            for i, column in enumerate(self._columns):
+                column[key] = [row[i] for row in rows]
+            if start < self._measured:
+                self._reset_widths()
+        else:
+            self._set_row(self._get_index(key), value)
+
+    def __delitem__(self, key):
+        if isinstance(key, slice):
+            start = min(range(*key.indices(len(self))), default=None)
+            for column in self._columns:
+                del column[key]
+            if start is not None and start < self._measured:
+                self._reset_widths()
+        else:
+            index = self._get_index(key)
+            measured = index < self._measured
+            for i, column in enumerate(self._columns):
+                if measured:
+                    self._remove_item(i, column[index])
+                del column[index]
+            if measured:
+                self._measured -= 1
+
+    def insert(self, index, row):
+        row = [self._sanitize(item) for item in row]
+        length = len(self)
+        if length == 0 and len(row) != len(self._columns):
+            # Number of columns may have changed while the table was empty
+            self._columns = [[] for item in row]
+            self._reset_widths()
+        if index < 0:
+            index = max(0, index + length)
+        index = min(index, length)
+        measured = index < self._measured
+        for i, (column, item) in enumerate(zip(self._columns, row)):
+            column.insert(index, item)
+            if measured:
+                self._add_item(i, item)
+        if measured:
+            self._measured += 1
+
+    def extend(self, rows):
+        if len(self) == 0 and len(rows[0]) != len(self._columns):
+            self._columns = [[] for item in rows[0]]
+            self._reset_widths()
+        sanitize = self._table.strip_ansi_sequences
+        for i, column in enumerate(self._columns):
+            if sanitize:
+                column.extend(self._sanitize(row[i]) for row in rows)
+            else:
+                column.extend([row[i] for row in rows])
+
+    def pop(self, index=-1):
+        index = self._get_index(index)
+        row = self._get_row(index)
+        del self[index]
+        return RowData(self._table, row)
+
+    def sort(self, key, reverse=False):
+        order = sorted(
+            range(len(self)),
+            key=lambda index: key(RowView(self, index)),
+            reverse=reverse,
+        )
+        for column in self._columns:
+            column[:] = [column[index] for index in order]
+        # Widths of the columns are not affected by the order of items
+        if self._measured < len(self):
+            self._reset_widths()
+
+    def reverse(self):
+        for column in self._columns:
+            column.reverse()
+        if self._measured < len(self):
+            self._reset_widths()
+
+    # Columns of an empty storage are not kept in sync with the table, they
+    # are recreated once a row is inserted.
+
+    def get_column(self, index):
+        if len(self) == 0:
+            return iter(())
+        return iter(self._columns[index])
+
+    def update_column(self, index, items):
+        if len(self) == 0:
+            return
+        column = self._columns[index]
+        for i, item in zip(range(len(column)), items):
+            column[i] = self._sanitize(item)
+        self._max_widths[index] = None
+
+    def insert_column(self, index, items):
+        """Insert a column if `items` has an item for every row.
+
+        Returns the number of items taken from `items`, the column is only
+        inserted if it's equal to the number of rows.
+        """
+        length = len(self)
+        if length == 0:
+            return 0
+        column = [
+            self._sanitize(item) for item in itertools.islice(items, length)
+        ]
+        if len(column) == length:
+            self._columns.insert(index, column)
+            self._max_widths.insert(index, None)
+            self._dynamic.insert(index, False)
+        return len(column)
+
+    def pop_column(self, index):
+        if len(self) == 0:
+            return []
+        self._max_widths.pop(index)
+        self._dynamic.pop(index)
+        return self._columns.pop(index)
+
+    def get_widths(self):
+        """Get the width of the widest item of every column.
+
+        Returns
+        -------
+        tuple:
+            List of widths and whether nested tables were found.
+        """
+        key = self._table._get_format_key()
+        if key != self._format_key:
+            self._format_key = key
+            self._reset_widths()
+        measured = self._measured
+        for i, column in enumerate(self._columns):
+            width = self._max_widths[i]
+            if width is None or self._dynamic[i]:
+                # Items such as nested tables can change without notice
+                width, self._dynamic[i] = self._measure(column)
+            elif measured < len(column):
+                new_width, dynamic = self._measure(
+                    itertools.islice(column, measured, None)
+                )
+                width = max(width, new_width)
+                self._dynamic[i] = dynamic
+            self._max_widths[i] = width
+        self._measured = len(self)
+        return list(self._max_widths), any(self._dynamic)
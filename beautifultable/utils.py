@@ -1,9 +1,10 @@
 """Module containing some utility methods"""
 
+import functools
 import warnings
 
 
-from .ansi import ANSIMultiByteString
+from .ansi import ANSIMultiByteString, is_printable_ascii
 from .compat import to_unicode
 from .exceptions import BeautifulTableDeprecationWarning
 
@@ -37,6 +38,14 @@ def _convert_to_numeric(item):
         return num
 
 
+def split_lines(item, detect_numerics):
+    """Split `item` into lines, converting the numeric ones if required"""
+    lines = to_unicode(item).split("\n")
+    if detect_numerics:
+        lines = [_convert_to_numeric(line) for line in lines]
+    return lines
+
+
 def get_output_str(item, detect_numerics, precision, sign_value):
     """Returns the final string which should be displayed"""
     if detect_numerics:
@@ -50,15 +59,122 @@ def get_output_str(item, detect_numerics, precision, sign_value):
     return to_unicode(item)
 
 
+def _termwidth(item):
+    return ANSIMultiByteString(item).termwidth()
+
+
+def _textwrap(item, width):
+    return tuple(ANSIMultiByteString(item).wrap(width))
+
+
+DEFAULT_CACHE_SIZE = 4096
+
+# Strings longer than this are wrapped lazily and never cached
+LARGE_ITEM_LENGTH = 4096
+
+_cached_termwidth = functools.lru_cache(DEFAULT_CACHE_SIZE)(_termwidth)
+_cached_textwrap = functools.lru_cache(DEFAULT_CACHE_SIZE)(_textwrap)
+
+
+def set_cache_size(maxsize):
+    """Set the number of entries kept by the width and wrap caches.
+
+    Strings which are not plain ASCII are parsed only once and the result
+    is reused until it is evicted in least recently used order. Setting
+    the size discards all cached entries. A size of 0 disables caching.
+
+    Parameters
+    ----------
+    maxsize : int
+        Maximum number of entries in each cache(default 4096).
+    """
+    global _cached_termwidth, _cached_textwrap
+    if not isinstance(maxsize, int) or maxsize < 0:
+        raise ValueError(
+            ("cache size must be a non-negative integer, " "was {}").format(
+                maxsize
+            )
+        )
+    _cached_termwidth = functools.lru_cache(maxsize)(_termwidth)
+    _cached_textwrap = functools.lru_cache(maxsize)(_textwrap)
+
+
+def cache_info():
+    """Return hit/miss statistics of the width and wrap caches.
+
+    Returns
+    -------
+    dict:
+        Mapping of 'termwidth' and 'textwrap' to a named tuple with
+        fields `hits`, `misses`, `maxsize` and `currsize`.
+    """
+    return {
+        "termwidth": _cached_termwidth.cache_info(),
+        "textwrap": _cached_textwrap.cache_info(),
+    }
+
+
+def clear_cache():
+    """Discard all entries of the width and wrap caches."""
+    _cached_termwidth.cache_clear()
+    _cached_textwrap.cache_clear()
+
+
 def termwidth(item):
     """Returns the visible width of the string as shown on the terminal"""
-    obj = ANSIMultiByteString(to_unicode(item))
-    return obj.termwidth()
+    item = to_unicode(item)
+    if is_printable_ascii(item):
+        return len(item)
+    return _cached_termwidth(item)
 
 
 def textwrap(item, width):
-    obj = ANSIMultiByteString(to_unicode(item))
-    return obj.wrap(width)
+    item = to_unicode(item)
+    if width > 0 and is_printable_ascii(item):
+        lines = []
+        for start in range(0, len(item), width):
+            end = start + width
+            lines.append(item[start:end])
+        return lines
+    return list(_cached_textwrap(item, width))
+
+
+def iter_textwrap(item, width):
+    """Returns an iterator over the lines of `item` wrapped to `width`.
+
+    Very large items are wrapped incrementally, so that memory used is
+    proportional to `width` rather than the length of `item`.
+    """
+    item = to_unicode(item)
+    if len(item) > LARGE_ITEM_LENGTH and not is_printable_ascii(item):
+        return ANSIMultiByteString.iter_wrap(item, width)
+    return iter(textwrap(item, width))
+
+
+def truncate(item, width, suffix=""):
+    """Clamp `item` so that it fits in `width` columns.
+
+    If `item` is wider than `width`, it is cut short and `suffix` is
+    appended to it. Scanning stops as soon as `width` is exceeded, so the
+    cost does not depend on the length of `item`.
+    """
+    item = to_unicode(item)
+    if is_printable_ascii(item):
+        if len(item) <= width:
+            return item
+    else:
+        clamped, truncated = ANSIMultiByteString.truncate_string(item, width)
+        if not truncated:
+            return item
+    if width - len(suffix) < 0:
+        return suffix[:width]
+    if is_printable_ascii(item):
+        return item[: width - len(suffix)] + suffix
+    # Clamped string is short, so truncating it again is cheap
+    clamped, _ = ANSIMultiByteString.truncate_string(
+        clamped, width - len(suffix)
+    )
+    return clamped + suffix
 
 
 def raise_suppressed(exp):
@@ -0,0 +1,78 @@
+"""Generate beautifultable/charwidth.py from the ``wcwidth`` package.
+
+Usage::
+
+    python scripts/gen_charwidth.py > beautifultable/charwidth.py
+
+``wcwidth()`` is evaluated for every code point, and consecutive code points
+of the same width are merged into inclusive ``(first, last)`` ranges.
+"""
+
+import sys
+
+import wcwidth
+
+HEADER = '''"""Terminal column widths of unicode code points.
+
+This table is generated from ``wcwidth`` {version} by evaluating ``wcwidth()``
+for every code point and merging consecutive code points of the same width
+into inclusive ``(first, last)`` ranges. Code points which are not part of
+any range are one column wide. Run ``scripts/gen_charwidth.py`` to
+regenerate it.
+"""
+'''
+
+# Name, comment and width of every table, in the order they are written
+TABLES = (
+    (
+        "NON_PRINTABLE",
+        "Control characters, these cannot be displayed in a table",
+        -1,
+    ),
+    (
+        "ZERO_WIDTH",
+        "Combining and other characters which do not advance the cursor",
+        0,
+    ),
+    ("WIDE", "East asian wide and fullwidth characters", 2),
+)
+
+
+def get_ranges():
+    """Return a mapping of width to the ranges of code points of that width.
+
+    One column wide code points are left out.
+    """
+    ranges = {width: [] for _, _, width in TABLES}
+    start = 0
+    current = wcwidth.wcwidth(chr(0))
+    for codepoint in range(1, sys.maxunicode + 2):
+        if codepoint <= sys.maxunicode:
+            width = wcwidth.wcwidth(chr(codepoint))
+            if width == current:
+                continue
+        if current in ranges:
+            ranges[current].append((start, codepoint - 1))
+        start = codepoint
+        if codepoint <= sys.maxunicode:
+            current = width
+    return ranges
+
+
+def main():
+    ranges = get_ranges()
+    tables = []
+    for name, comment, width in TABLES:
+        lines = ["# " + comment, name + " = ("]
+        for first, last in ranges[width]:
+            lines.append("    (0x{:05X}, 0x{:05X}),".format(first, last))
+        lines.append(")")
+        tables.append("\n".join(lines) + "\n")
+    # One blank line after the docstring and two between the tables
+    sys.stdout.write(
+        HEADER.format(version=wcwidth.__version__) + "\n" + "\n\n".join(tables)
+    )
+
+
+if __name__ == "__main__":
+    main()
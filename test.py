@@ -2,9 +2,17 @@
 
 
 import unittest
+import gc
+import io
 import os
+import sys
+import tracemalloc
 
 from beautifultable import BeautifulTable
+from beautifultable.ansi import ANSIMultiByteString, minimize_ansi
+from beautifultable import utils
+from beautifultable.rows import RowLayout
+from beautifultable.utils import termwidth, textwrap, truncate
 
 
 class TableOperationsTestCase(unittest.TestCase):
@@ -172,6 +180,29 @@ class TableOperationsTestCase(unittest.TestCase):
         self.assertEqual(len(self.table), 6)
         self.compare_iterable(self.table[5], row)
 
+    def test_append_rows(self):
+        for columnar in (False, True):
+            rows = [["Gary", 2, "boy"], ("Mary", 3, "girl")]
+            rows.append(iter(["Ava", 4, 1]))
+            table = BeautifulTable(columnar=columnar)
+            table.append_rows(rows[:2])
+            table.append_rows(rows[:2], validate=False)
+            self.assertEqual(table.column_count, 3)
+            self.assertEqual(len(table), 4)
+            self.compare_iterable(table[3], rows[1])
+            table.append_row(["Ava", 4, "girl"])
+            string = table.get_string()
+            table.append_rows(iter([rows[0], rows[2]]))
+            self.assertEqual(len(table), 7)
+            self.compare_iterable(table[6], ["Ava", 4, 1])
+            self.assertNotEqual(table.get_string(), string)
+            self.assertRaises(ValueError, table.append_rows, [[1], [1, 2, 3]])
+            self.assertRaises(TypeError, table.append_rows, [[1, 2, 3], 1])
+            self.assertRaises(TypeError, table.append_rows, ["abc"])
+            self.assertEqual(len(table), 7)
+            table.append_rows([])
+            self.assertEqual(len(table), 7)
+
     def test_insert_row(self):
         row = ["Gary", 2, "boy"]
         position = 2
@@ -351,6 +382,302 @@ class TableOperationsTestCase(unittest.TestCase):
 +----------+------+--------+"""
         self.assertEqual(string, self.table.get_string())
 
+    def test_detect_numerics_after_update(self):
+        table = BeautifulTable()
+        table.append_row(["+5", "2.50000"])
+        self.assertEqual(
+            table.get_string(), "+---+-----+\n| 5 | 2.5 |\n+---+-----+"
+        )
+        table[0][0] = "abc"
+        table.detect_numerics = False
+        self.assertEqual(
+            table.get_string(),
+            "+-----+---------+\n| abc | 2.50000 |\n+-----+---------+",
+        )
+        table.detect_numerics = True
+        table.sign_mode = table.SM_PLUS
+        self.assertEqual(
+            table.get_string(),
+            "+-----+------+\n| abc | +2.5 |\n+-----+------+",
+        )
+
+    def test_formatted_cache_invalidation(self):
+        table = BeautifulTable()
+        table.column_headers = ["a", "b"]
+        table.append_row([1.23456, "x"])
+        self.assertIn("1.235", table.get_string())
+        table.numeric_precision = 1
+        self.assertIn("| 1.2 |", table.get_string())
+        table.update_column("a", [7])
+        self.assertIn("| 7 |", table.get_string())
+        table.update_row(0, [8, "y"])
+        self.assertIn("| 8 | y |", table.get_string())
+        table.column_headers[1] = "c"
+        self.assertIn("| a | c |", table.get_string())
+
+    def test_formatted_cache_reuse(self):
+        # Only row oriented tables keep formatted items
+        table = BeautifulTable(columnar=False)
+        table.column_headers = ["name", "score"]
+        table.append_row(["Jacob", "1.2345"])
+        table.append_row(["Isabella", "2.5\n-3"])
+        table.render_to(io.StringIO())
+        self.assertIsNone(table[1]._widths)
+        table.get_string()
+        widths = table[1]._widths
+        typed = table[1]._typed
+        self.assertEqual(typed, ("Isabella", (2.5, -3)))
+        table[0]["name"] = "Jake"
+        self.assertIsNone(table[0]._widths)
+        table.numeric_precision = 1
+        self.assertIn("|  1.2  |", table.get_string())
+        self.assertIs(table[1]._typed, typed)
+        table.numeric_precision = 3
+        table.get_string()
+        self.assertEqual(table[1]._widths, widths)
+
+    def test_incremental_column_widths(self):
+        def rebuilt(table):
+            new_table = BeautifulTable()
+            new_table.column_headers = table.column_headers
+            for row in table:
+                new_table.append_row(list(row))
+            return new_table.get_string()
+
+        table = self.table
+        operations = [
+            lambda: table.append_row(["Alexander", 10, "boy"]),
+            lambda: table.pop_row(),
+            lambda: table.pop_row(1),
+            lambda: table.insert_row(0, ["Al", 100000, "b"]),
+            lambda: table.update_row(0, ["Mia", 4, "girl"]),
+            lambda: table.update_row(slice(0, 2), [["A", 1, "b"]] * 2),
+            lambda: table[0].__setitem__("name", "Christopher"),
+            lambda: table.update_column("name", ["x"] * len(table)),
+            lambda: table.insert_column(1, "age", [123456] * len(table)),
+            lambda: table.pop_column("rank"),
+            lambda: table.__delitem__(0),
+            lambda: table.append_row(["Isabella", 12, "girl"]),
+            lambda: table.update_row(slice(0, 2), [["Zoe", 2, "b"]] * 2),
+            lambda: table.__delitem__(slice(0, -1)),
+            lambda: setattr(table, "numeric_precision", 1),
+        ]
+        for operation in operations:
+            table.get_string()
+            operation()
+            self.assertEqual(table.get_string(), rebuilt(table))
+
+    def test_string_cache(self):
+        table = self.table
+        string = table.get_string()
+        self.assertIs(table.get_string(), string)
+        operations = [
+            lambda: setattr(table, "column_separator_char", ":"),
+            lambda: setattr(table, "max_table_width", 24),
+            lambda: table.column_alignments.__setitem__(0, table.ALIGN_LEFT),
+            lambda: table.left_padding_widths.__setitem__(1, 3),
+            lambda: table.column_headers.__setitem__(2, "sex"),
+            lambda: table[0].__setitem__("name", "Jake"),
+            lambda: table.sort("name"),
+            lambda: table.reverse(),
+            lambda: table.pop_row(),
+            lambda: table.append_row(["Liam", 4, "boy"]),
+        ]
+        for operation in operations:
+            operation()
+            new_string = table.get_string()
+            self.assertNotEqual(new_string, string)
+            string = new_string
+        nested = BeautifulTable()
+        nested.append_row(["a", "b"])
+        table.append_row([nested, 5, "boy"])
+        string = table.get_string()
+        nested[0][0] = "z"
+        self.assertNotEqual(table.get_string(), string)
+        items = ["a"]
+        table.append_row([items, 6, "boy"])
+        table.get_string()
+        items.append("bbbbbbb")
+        table.append_row(["Noah", 7, "boy"])
+        self.assertIn("bbbb", table.get_string())
+
+    def test_render_to(self):
+        table = self.table
+        table.append_row(["Ava\nRose", 4, "girl"])
+        table.width_exceed_policy = table.WEP_WRAP
+        table.max_table_width = 18
+        self.assertEqual(
+            list(table.iter_lines()), table.get_string().split("\n")
+        )
+        for char, buffer_size in zip("-=~", (1, 50, 65536)):
+            table.row_separator_char = char
+            # The second time around the output is already cached
+            for i in range(2):
+                fileobj = io.StringIO()
+                writes = []
+                fileobj.write = writes.append
+                table.render_to(fileobj, buffer_size=buffer_size)
+                self.assertEqual("".join(writes), table.get_string() + "\n")
+                if i == 0 and buffer_size == 1:
+                    self.assertGreater(len(writes), 1)
+            self.assertEqual(len(writes), 1)
+        empty = BeautifulTable()
+        self.assertEqual(list(empty.iter_lines()), [])
+        fileobj = io.StringIO()
+        empty.render_to(fileobj)
+        self.assertEqual(fileobj.getvalue(), "")
+
+    def test_render_to_memory(self):
+        class NullWriter(object):
+            size = 0
+
+            def write(self, string):
+                self.size += len(string)
+
+        def create_table(columnar):
+            table = BeautifulTable(columnar=columnar)
+            table.column_headers = ["id", "name", "score"]
+            for i in range(2000):
+                table.append_row([i, "name{}".format(i), i / 4])
+            return table
+
+        for columnar in (False, True):
+            table = create_table(columnar)
+            other = create_table(columnar)
+            writer = NullWriter()
+            gc.collect()
+            # Fill the free lists of the interpreter first, tracemalloc
+            # counts the objects kept there as allocated
+            other.render_to(NullWriter(), buffer_size=1024)
+            tracemalloc.start()
+            try:
+                table.render_to(writer, buffer_size=1024)
+                peak = tracemalloc.get_traced_memory()[1]
+                gc.collect()
+                retained = tracemalloc.get_traced_memory()[0]
+            finally:
+                tracemalloc.stop()
+            self.assertGreater(writer.size, 100000)
+            self.assertLess(peak, writer.size // 10)
+            self.assertLess(retained, writer.size // 100)
+
+    def test_horizontal_line_cache(self):
+        table = self.table
+        table.set_style(BeautifulTable.STYLE_GRID)
+        table.get_string()
+        separator = table._get_row_separator()
+        self.assertIs(table._get_row_separator(), separator)
+        self.assertEqual(separator, "╟──────────┼──────┼────────╢")
+        table.column_widths[0] += 2
+        self.assertEqual(len(table._get_row_separator()), len(separator) + 2)
+        table.intersect_row_mid = "*"
+        self.assertEqual(table._get_row_separator().count("*"), 2)
+        table.set_style(BeautifulTable.STYLE_DEFAULT)
+        self.assertEqual(
+            table._get_row_separator(), "+------------+------+--------+"
+        )
+
+    def test_row_layout(self):
+        table = self.table
+        table.column_alignments = [
+            table.ALIGN_LEFT,
+            table.ALIGN_RIGHT,
+            table.ALIGN_CENTER,
+        ]
+        table.left_padding_widths[0] = 2
+        lines = table.get_string().splitlines()
+        layout = RowLayout(table)
+        self.assertEqual(layout.get_item_width(0), 8)
+        self.assertEqual(
+            layout.format_row([["Jacob"], ["1"], ["boy"]], [[5], [1], [3]]),
+            ["|  Jacob    |    1 |  boy   |"],
+        )
+        self.assertEqual(str(table[0]), lines[3])
+        self.assertEqual(
+            layout.format_row([["Isabella!"], ["1"], [""]], [[9], [1], [0]]),
+            ["|  Isabella |    1 |        |", "|  !        |      |        |"],
+        )
+        table.width_exceed_policy = table.WEP_ELLIPSIS
+        layout = RowLayout(table)
+        self.assertEqual(
+            layout.format_row([["Isabella!"], ["1"], [""]], [[9], [1], [0]]),
+            ["|  Isabe... |    1 |        |"],
+        )
+
+    def test_compact_rows(self):
+        row = self.table[0]
+        self.assertFalse(hasattr(row, "__dict__"))
+        self.assertFalse(hasattr(self.table.column_headers, "__dict__"))
+        self.assertFalse(hasattr(self.table.column_widths, "__dict__"))
+        self.assertIsInstance(row._row, tuple)
+        self.assertEqual(row[0:2], ["Jacob", 1])
+        row["rank"] = 10
+        self.assertEqual(list(row), ["Jacob", 10, "boy"])
+        self.assertEqual(self.table.column_headers[1:], ["rank", "gender"])
+
+    def test_columnar_storage(self):
+        table = BeautifulTable(columnar=True)
+        table.column_headers = ["name", "rank", "gender"]
+        for row in self.table:
+            table.append_row(row)
+        self.assertEqual(table.get_string(), self.table.get_string())
+        for t in (table, self.table):
+            t.insert_column(1, "age", [10, 12, 9, 11, 13])
+            t.pop_column("gender")
+            t.update_column("rank", [5, 4, 3, 2, 1])
+            t[0]["name"] = "Jake"
+            t.insert_row(2, ["Emma", 14, 6])
+            t.sort("rank")
+            del t[-1]
+        self.assertEqual(table.get_string(), self.table.get_string())
+        self.assertEqual(list(table.get_column("age")), [13, 11, 9, 12, 10])
+        self.assertEqual(list(table.pop_row(0)), ["Michael", 13, 1])
+        self.assertIn(["Sophia", 11, 2], table)
+        self.assertEqual(len(table[1:3]), 2)
+        with self.assertRaises(ValueError):
+            table.insert_column(0, "x", [1])
+        self.assertEqual(table.column_count, 3)
+
+    def test_header_indices(self):
+        table = self.table
+        self.assertEqual(table.get_column_index("gender"), 2)
+        table.column_headers[0] = "gender"
+        self.assertEqual(table.get_column_index("gender"), 0)
+        self.assertEqual(table[1]["gender"], "Isabella")
+        table.insert_column(0, "rank", [0] * 5)
+        self.assertEqual(table.get_column_index("rank"), 0)
+        self.assertEqual(table.get_column_index("gender"), 1)
+        table.pop_column(0)
+        table.pop_column(0)
+        self.assertEqual(table.get_column_index("gender"), 1)
+        self.assertNotIn("name", table)
+        with self.assertRaises(KeyError):
+            table.get_column_index("name")
+
+    def test_slice_shares_rows(self):
+        for columnar in (False, True):
+            table = BeautifulTable(columnar=columnar)
+            table.column_headers = ["name", "rank", "gender"]
+            for row in self.table:
+                table.append_row(row)
+            string = table.get_string()
+            new_table = table[1:3]
+            filtered = table.filter(lambda row: row["gender"] == "boy")
+            if not columnar:
+                self.assertIs(new_table[0]._row, table[1]._row)
+            new_table[0]["name"] = "Isa"
+            table[2]["name"] = "Ethan Hunt"
+            self.assertEqual(table[1]["name"], "Isabella")
+            self.assertEqual(new_table[1]["name"], "Ethan")
+            names = list(filtered.get_column("name"))
+            self.assertEqual(names, ["Jacob", "Ethan", "Michael"])
+            self.assertEqual(table.copy().get_string(), table.get_string())
+            self.assertNotEqual(table.get_string(), string)
+            table.left_padding_widths = 3
+            table.right_padding_widths = 0
+            self.assertEqual(table.copy().get_string(), table.get_string())
+            self.assertEqual(list(table[:2].right_padding_widths), [0, 0, 0])
+
     def test_wep_wrap(self):
         self.create_table(20)
         self.table.width_exceed_policy = self.table.WEP_WRAP
@@ -441,6 +768,168 @@ class TableOperationsTestCase(unittest.TestCase):
 +----+----------+------+--------+"""
         self.assertEqual(string, self.table.get_string())
 
+    def test_serialno_does_not_modify_table(self):
+        self.table.serialno = True
+        lines = self.table.stream([["Emma", 3, "girl"]], append=True)
+        next(lines)
+        # Abandoning the generator must leave the table intact
+        del lines
+        self.assertEqual(self.table.column_count, 3)
+        self.assertEqual(list(self.table.column_widths), [10, 6, 8])
+        self.assertEqual(list(self.table[0]), ["Jacob", 1, "boy"])
+        lines = self.table.get_string().splitlines()
+        self.assertEqual(lines[1], "| SN |   name   | rank | gender |")
+        self.assertEqual(lines[-2], "| 5  | Michael  |  3   |  boy   |")
+        lines = list(self.table.stream([["Emma", 3, "girl"]]))
+        self.assertEqual(lines[-2], "|  6   |   Emma   |  3   |  girl  |")
+        self.assertEqual(len(self.table), 5)
+        # Serial numbers are only signed if numerics are detected
+        self.table.detect_numerics = False
+        self.table.sign_mode = self.table.SM_PLUS
+        for i in range(5):
+            self.table.append_row(["Emma", i, "girl"])
+        lines = self.table.get_string().splitlines()
+        self.assertEqual(lines[-2], "| 10 |   Emma   |  4   |  girl  |")
+
+    def test_stream_keep_last(self):
+        table = self.table
+        rows = [["Emma", 3, "girl"], ["Liam", 4, "boy"], ["Noah", 4, "boy"]]
+        string = table.get_string()
+        lines = table.stream(iter(rows), append=True, keep_last=4)
+        for line in lines:
+            # Rows are only added once the stream ends
+            self.assertEqual(len(table), 5)
+        self.assertEqual(line.count("\n"), 0)
+        self.assertEqual(len(table), 4)
+        self.assertEqual(list(table[0]), ["Michael", 3, "boy"])
+        self.assertEqual(list(table[-1]), ["Noah", 4, "boy"])
+        self.assertNotEqual(table.get_string(), string)
+        rows = [["Ava", 5, "girl"], ["Mia", 5, "girl"]]
+        lines = table.stream(iter(rows), append=True, keep_last=2)
+        while "Ava" not in next(lines):
+            pass
+        lines.close()
+        self.assertEqual(len(table), 2)
+        self.assertEqual(list(table[-1]), ["Ava", 5, "girl"])
+        with self.assertRaises(ValueError):
+            list(table.stream([["Mia", 5, "girl"], [1]], append=True))
+        self.assertEqual(list(table[-1]), ["Mia", 5, "girl"])
+        self.assertEqual(len(table), 3)
+
+    def test_stream_sample(self):
+        rows = [["Jacob", 1, "boy"], ["Isabella", 1, "girl"], ["Ethan", 2, 3]]
+        table = BeautifulTable()
+        lines = list(table.stream(iter(rows), sample_size=2))
+        self.assertEqual(len(table), 0)
+        self.assertEqual(table.column_count, 3)
+        self.assertEqual(list(table.column_widths), [10, 3, 6])
+        self.assertEqual(lines[0], "+----------+---+------+")
+        self.assertEqual(lines[-2], "|  Ethan   | 2 |  3   |")
+        table = BeautifulTable()
+        table.serialno = True
+        lines = list(table.stream(rows, append=True, sample_time=60))
+        self.assertEqual(len(table), 3)
+        self.assertEqual(lines[-2], "| 3  |  Ethan   | 2 |  3   |")
+        # Existing rows are taken into account as well
+        lines = list(table.stream([["Ava", 10000, 1]], sample_size=1))
+        self.assertEqual(lines[-2], "| 4  |   Ava    | 10000 |  1   |")
+
+    def test_max_rows(self):
+        string = """+------+-----+-----+
+|  SN  | nam | ran |
+|      |  e  |  k  |
++------+-----+-----+
+|  1   | Jac | 100 |
+|      | ob  |     |
++------+-----+-----+
+| ...  | ... | ... |
++------+-----+-----+
+|  5   | ... |  3  |
++------+-----+-----+"""
+        for columnar in (False, True):
+            table = BeautifulTable(max_width=20, columnar=columnar)
+            table.column_headers = ["name", "rank"]
+            table.append_row(["Jacob", 100])
+            table.append_rows([["Isabella Rossellini", 1]] * 3)
+            table.append_row(["...", 3])
+            table.serialno = True
+            table.max_rows = 2
+            self.assertEqual(table.get_string(), string)
+            self.assertIs(table.get_string(), table.get_string())
+            self.assertEqual("\n".join(table.iter_lines()), string)
+            table.max_rows = 5
+            self.assertIn("Isabe", table.get_string())
+            table.max_rows = 0
+            self.assertEqual(len(table.get_string().splitlines()), 6)
+            with self.assertRaises(ValueError):
+                table.max_rows = -1
+            with self.assertRaises(TypeError):
+                table.max_rows = "3"
+            self.assertEqual(table.max_rows, 0)
+
+    @unittest.skipIf(sys.version_info < (3, 7), "requires asyncio.run")
+    def test_astream(self):
+        import asyncio
+
+        class Writer(object):
+            def __init__(self):
+                self.chunks = []
+                self.drained = 0
+
+            def write(self, data):
+                self.chunks.append(data)
+
+            async def drain(self):
+                self.drained += 1
+
+        async def rows():
+            for row in [["Emma", 3, "girl"], ["Liam", 4, "boy"]]:
+                await asyncio.sleep(0)
+                yield row
+
+        async def collect(lines):
+            return [line async for line in lines]
+
+        table = self.table
+        expected = list(table.stream(iter([["Emma", 3, "girl"]])))
+        lines = asyncio.run(collect(table.astream([["Emma", 3, "girl"]])))
+        self.assertEqual(lines, expected)
+        lines = asyncio.run(collect(table.astream(rows(), sample_size=1)))
+        self.assertEqual(lines[-2], "|   Liam   |  4   |  boy   |")
+        self.assertEqual(len(table), 5)
+
+        events = []
+
+        async def slow_rows():
+            yield ["Emma", 3, "girl"]
+            await asyncio.sleep(0.1)
+            events.append("row")
+            yield ["Liam", 4, "boy"]
+
+        async def collect_events(lines):
+            result = []
+            async for line in lines:
+                events.append("line")
+                result.append(line)
+            return result
+
+        # Sampling stops even if the next row is late
+        lines = asyncio.run(
+            collect_events(table.astream(slow_rows(), sample_time=0.01))
+        )
+        self.assertLess(events.index("line"), events.index("row"))
+        self.assertEqual(lines[-4], "|   Emma   |  3   |  girl  |")
+        self.assertEqual(lines[-2], "|   Liam   |  4   |  boy   |")
+        writer = Writer()
+        asyncio.run(
+            table.astream_to(writer, rows(), append=True, buffer_size=100)
+        )
+        self.assertEqual(len(table), 7)
+        output = b"".join(writer.chunks).decode("utf-8")
+        self.assertEqual(output, table.get_string() + "\n")
+        self.assertGreater(len(writer.chunks), 1)
+        self.assertEqual(writer.drained, len(writer.chunks))
+
     def test_eastasian_characters(self):
         string = u"""+------------+------+--------+
 |    name    | rank | gender |
@@ -549,6 +1038,128 @@ class TableOperationsTestCase(unittest.TestCase):
         table.append_row([long_string, 2, "girl"])
         self.assertEqual(string, table.get_string())
 
+    def test_minimize_ansi(self):
+        red, bold, green, reset = "\x1b[31m", "\x1b[1m", "\x1b[32m", "\x1b[0m"
+        self.assertEqual(
+            minimize_ansi(red + "a" + reset + red + "b" + reset),
+            red + "ab" + reset,
+        )
+        self.assertEqual(minimize_ansi(red + reset + "a"), "a")
+        self.assertEqual(
+            minimize_ansi(red + "a" + reset + "  " + red + bold + "b" + reset),
+            red + "a  " + bold + "b" + reset,
+        )
+        # Background colors are visible on spaces
+        self.assertEqual(
+            minimize_ansi("\x1b[41ma\x1b[0m \x1b[41mb\x1b[0m"),
+            "\x1b[41ma\x1b[0m \x1b[41mb\x1b[0m",
+        )
+        table = BeautifulTable()
+        table.set_style(BeautifulTable.STYLE_COMPACT)
+        table.append_row([green + "up" + reset, green + "ok" + reset])
+        self.assertEqual(table.get_string(), " " + green + "up   ok " + reset)
+
+    def test_strip_ansi_sequences(self):
+        table = BeautifulTable()
+        table.strip_ansi_sequences = True
+        table.column_headers = ["\x1b[1mname\x1b[0m", "rank", "gender"]
+        table.append_row(["\x1b[31mAdam\x1b[0m", 2, "boy"])
+        table.insert_column(1, "age", ["\x1b[32m20\x1b[0m"])
+        table[0][3] = "\x1b[34mman\x1b[0m"
+        self.assertEqual(
+            list(table.column_headers), ["name", "age", "rank", "gender"]
+        )
+        self.compare_iterable(table[0], ["Adam", "20", 2, "man"])
+        self.assertNotIn("\x1b", table.get_string())
+
+    def test_ascii_fast_path(self):
+        for string in ("", "a", "Isabella", "lorem ipsum dolor sit amet"):
+            obj = ANSIMultiByteString(string)
+            self.assertEqual(termwidth(string), obj.termwidth())
+            for width in (1, 3, 8, 40):
+                self.assertEqual(textwrap(string, width), obj.wrap(width))
+        self.assertEqual(termwidth(u"こんにちは"), 10)
+        self.assertEqual(termwidth("\x1b[31mAdam\x1b[0m"), 4)
+
+    def test_ansi_string_slicing(self):
+        string = ANSIMultiByteString("\x1b[31mab\x1b[0mc\x1b[32mde\x1b[0m")
+        self.assertEqual(len(string), 5)
+        self.assertEqual(string[0], "\x1b[31ma\x1b[0m")
+        self.assertEqual(string[2], "c")
+        self.assertEqual(string[-1], "\x1b[32me\x1b[0m")
+        self.assertEqual(string[1:4], "\x1b[31mb\x1b[0mc\x1b[32md\x1b[0m")
+        self.assertEqual(string[2:3], "c")
+        self.assertEqual(string[::2], "\x1b[31ma\x1b[0mc\x1b[32me\x1b[0m")
+
+    def test_ansi_states_are_shared(self):
+        string = ANSIMultiByteString("\x1b[31mab\x1b[0mc\x1b[31md\x1b[0m")
+        self.assertIs(string._span_states[0], string._span_states[2])
+        for i in range(100):
+            ANSIMultiByteString("\x1b[38;5;{}mab\x1b[0m".format(i))
+        gc.collect()
+        # Only the states used by `string` are left
+        self.assertEqual(len(ANSIMultiByteString._STATES), 2)
+
+    def test_truncate(self):
+        long_string = "\x1b[31mThis is a very \x1b[0m\x1b[32mlong name\x1b[0m"
+        self.assertEqual(truncate(long_string, 30), long_string)
+        self.assertEqual(truncate(long_string, 7), "\x1b[31mThis is\x1b[0m")
+        self.assertEqual(
+            truncate(long_string, 7, "..."), "\x1b[31mThis\x1b[0m..."
+        )
+        self.assertEqual(truncate(long_string, 2, "..."), "..")
+        self.assertEqual(truncate("abcdef", 4, "..."), "a...")
+        self.assertEqual(truncate(u"こんにちは" * 5000, 5), u"こん")
+        self.assertEqual(
+            ANSIMultiByteString(long_string).truncate(7),
+            ANSIMultiByteString(long_string).wrap(7)[0],
+        )
+
+    def test_iter_wrap(self):
+        long_string = u"\x1b[31mこれは非常に長い\x1b[0m\x1b[32m名前です\x1b[0m"
+        lines = ANSIMultiByteString.iter_wrap(long_string * 500, 15)
+        self.assertFalse(isinstance(lines, list))
+        self.assertEqual(
+            list(lines), ANSIMultiByteString(long_string * 500).wrap(15)
+        )
+
+        table = BeautifulTable(max_width=30)
+        table.append_row([long_string * 500, 2, "girl"])
+        lines = table.get_string().split("\n")
+        self.assertEqual(len(lines), 860)
+        self.assertEqual(
+            lines[1], u"| \x1b[31mこれは非常に長\x1b[0m  | 2 | girl |"
+        )
+
+    def test_unicode_widths(self):
+        self.assertEqual(termwidth(u"\U0001F600"), 2)
+        self.assertEqual(termwidth(u"e\u0301"), 1)
+        self.assertEqual(termwidth(u"\uff21\uff22"), 4)
+        with self.assertRaises(ValueError):
+            termwidth(u"\u00e9\x07")
+
+    def test_width_cache(self):
+        utils.clear_cache()
+        string = u"\x1b[31mこんにちは\x1b[0m"
+        for _ in range(3):
+            self.assertEqual(termwidth(string), 10)
+            self.assertEqual(len(textwrap(string, 4)), 3)
+        info = utils.cache_info()
+        self.assertEqual(info["termwidth"].misses, 1)
+        self.assertEqual(info["termwidth"].hits, 2)
+        self.assertEqual(info["textwrap"].hits, 2)
+
+        utils.set_cache_size(1)
+        termwidth(u"あ")
+        termwidth(u"い")
+        termwidth(u"あ")
+        info = utils.cache_info()
+        self.assertEqual(info["termwidth"].misses, 3)
+        self.assertEqual(info["termwidth"].currsize, 1)
+        with self.assertRaises(ValueError):
+            utils.set_cache_size(-1)
+        utils.set_cache_size(utils.DEFAULT_CACHE_SIZE)
+
     # Test on empty table
 
     def test_empty_table_by_column(self):